@@ -13,6 +13,7 @@ from pathlib import Path
 from zoneinfo import ZoneInfo
 
 import environ
+from django.core.exceptions import ImproperlyConfigured
 
 # set casting, default value
 env = environ.Env(DEBUG=(bool, True))
@@ -71,7 +72,7 @@ if DEBUG:
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",  # Enable WhiteNoise
+    "solution.middleware.WhiteNoiseMiddleware",  # Enable WhiteNoise
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -112,6 +113,42 @@ WSGI_APPLICATION = "capstone.wsgi.application"
 
 DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": BASE_DIR / "db.sqlite3"}}
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+#
+# CACHE_URL picks the backend, e.g. "redis://cache:6379/0" (needs the redis
+# package) or "pymemcache://cache:11211". The rate limits and the reference data
+# versions count with incr(), which must be atomic across processes, so without
+# DEBUG it is required and must be Redis or memcached. With DEBUG it defaults to
+# an in-process cache for the single process dev server, holding up to 10000
+# entries instead of 300 so sessions aren't evicted early. Sessions, CSRF
+# tokens, view and fragment caching and the solution caches all use it.
+
+CACHES = {
+    "default": {
+        **env.cache_url(
+            "CACHE_URL", default="locmemcache://?max_entries=10000" if DEBUG else environ.Env.NOTSET
+        ),
+        "KEY_PREFIX": "capstone",
+    }
+}
+
+ATOMIC_CACHE_BACKENDS = (
+    "django.core.cache.backends.redis.RedisCache",
+    "django.core.cache.backends.memcached.PyMemcacheCache",
+    "django.core.cache.backends.memcached.PyLibMCCache",
+)
+if not DEBUG and CACHES["default"]["BACKEND"] not in ATOMIC_CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"CACHE_URL must point to Redis or memcached, {CACHES['default']['BACKEND']} "
+        "can't count rate limited attempts across processes"
+    )
+
+# Sessions are read from the cache and written through to the database, so a
+# request with a session, which CSRF_USE_SESSIONS makes every form post, skips
+# the django_session query when the cache has it
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
 AUTH_USER_MODEL = "solution.User"
 
 # Password validation
@@ -142,11 +179,18 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/4.1/howto/static-files/
 
-# WhiteNoise compression and caching support
+# WhiteNoise compression and caching support. Production builds are fingerprinted
+# and precompressed by collectstatic, see solution.storage, and served with
+# "Cache-Control: immutable", see solution.middleware
 STORAGES = {
     "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
-    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
-    # "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "solution.storage.ViteManifestStaticFilesStorage"
+        )
+    },
 }
 
 
@@ -161,6 +205,16 @@ MEDIA_ROOT = BASE_DIR / "media"
 # http://localhost:8000/media/
 MEDIA_URL = "/media/"
 
+# Route MEDIA_URL through solution.views.serve_media, which sends the immutable
+# Cache-Control of content-addressed files. When a proxy serves MEDIA_ROOT
+# instead, it must send "Cache-Control: public, max-age=31536000, immutable"
+# for paths containing "/sha256/" itself.
+SERVE_MEDIA = env.bool("SERVE_MEDIA", default=DEBUG)
+
+# Seconds a media file written or reused by an upload is kept even though no
+# committed row references it yet, see solution.media
+MEDIA_ORPHAN_GRACE_PERIOD = 10 * 60
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
@@ -168,8 +222,9 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "NON_FIELD_ERRORS_KEY": "errors",
+    # Signed tokens first, they cost an HMAC where Basic runs a password hash
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.BasicAuthentication",
+        "solution.api.authentication.SignedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     # Use Django's standard `django.contrib.auth` permissions,
@@ -178,6 +233,7 @@ REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
         "solution.api.renderers.ORJSONRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
+        "solution.api.renderers.NDJSONRenderer",
     ],
     "DEFAULT_PARSER_CLASSES": [
         "solution.api.parsers.ORJSONParser",
@@ -190,12 +246,16 @@ REST_FRAMEWORK = {
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "Solution API",
-    "DESCRIPTION": "All fields must be changed to camelCase before use",
+    "DESCRIPTION": "Solution REST API",
     "VERSION": "1.0.0",
     "SERVE_INCLUDE_SCHEMA": False,
     "SERVE_PUBLIC": False,
     "SORT_OPERATIONS": False,
     "CAMELIZE_NAMES": True,
+    "POSTPROCESSING_HOOKS": [
+        "drf_spectacular.hooks.postprocess_schema_enums",
+        "solution.api.schema.camelize_serializer_fields",
+    ],
 }
 
 DRF_STANDARDIZED_ERRORS = {
@@ -203,14 +263,38 @@ DRF_STANDARDIZED_ERRORS = {
     "EXCEPTION_FORMATTER_CLASS": "solution.api.exception.MyExceptionFormatter",
 }
 
-DJANGO_VITE = {"default": {"dev_mode": True, "dev_server_port": 5173}}
+# Without dev mode, assets come from the "vite build" output in
+# solution/static/solution, the "outDir" and "base" of the vite config, and are
+# looked up in its manifest.json once collected into STATIC_ROOT
+DJANGO_VITE = {
+    "default": {
+        "dev_mode": env.bool("VITE_DEV_MODE", default=DEBUG),
+        "dev_server_port": 5173,
+        "static_url_prefix": "solution",
+    }
+}
+
+# Seconds a job filter modal count is reused for the same filters
+JOB_FACETS_CACHE_TIMEOUT = 30
+
+# Seconds API access and refresh tokens stay valid, see solution.api.authentication
+API_ACCESS_TOKEN_LIFETIME = 5 * 60
+API_REFRESH_TOKEN_LIFETIME = 24 * 60 * 60
+
+# Attempts allowed per client IP and per username within a sliding window of
+# seconds, checked before any password is hashed, see solution.ratelimit
+RATE_LIMITS = {
+    "login": (10, 60),
+    "register": (5, 10 * 60),
+    "change-password": (5, 10 * 60),
+}
 
-# Same as "ourDir" in vite config
-# Include DJANGO_VITE_ASSETS_PATH into STATICFILES_DIRS to be copied inside
-# when run command python manage.py collectstatic
-# STATICFILES_DIRS = [BASE_DIR / "solution/static/solution"]
+# Worker processes for CPU bound background work, like image variants
+BACKGROUND_PROCESSES = 2
 
-FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10 Mb limit
+# Uploads above this are streamed to a temporary file instead of being held in
+# memory, so concurrent photo uploads don't each keep a full copy in RAM
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024
 
 LOGGING = {
     "version": 1,
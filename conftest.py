@@ -1,10 +1,11 @@
 import datetime
+import hashlib
 import io
-import os
 
 import pytest
+from django.core.cache import cache
+from django.test import override_settings
 from PIL import Image
-from django.conf import settings
 from rest_framework.test import APIClient
 
 from solution.models import User
@@ -23,6 +24,24 @@ def whitenoise_autorefresh(settings):
     settings.WHITENOISE_AUTOREFRESH = True
 
 
+@pytest.fixture(autouse=True, scope="session")
+def media_root(tmp_path_factory):
+    """
+    Write uploads to a temporary MEDIA_ROOT instead of the project's. Session scoped, so
+    files created in setUpTestData land there too.
+    """
+    with override_settings(MEDIA_ROOT=tmp_path_factory.mktemp("media")):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Start every test with an empty cache, so rate limit counters don't leak between tests
+    """
+    cache.clear()
+
+
 @pytest.fixture(scope="class")
 def get_image_file(request):
     def function(request):
@@ -39,11 +58,11 @@ def get_image_file(request):
 
 @pytest.fixture(scope="class")
 def get_image_path(request):
-    def function(request, user_id: int, storage_path: str):
-        # Change the current working directory to the specified directory
-        os.chdir(settings.BASE_DIR / f"media/solution/user_{user_id}/{storage_path}")
-        image_name = os.listdir()[0]
-        return f"http://testserver/media/solution/user_{user_id}/{storage_path}/{image_name}"
+    def function(request, storage_path: str):
+        # Uploads are named by the SHA-256 of their content, see solution.storage
+        with next(request.get_image_file()) as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+        return f"http://testserver/media/solution/{storage_path}/sha256/{digest[:2]}/{digest}.png"
 
     request.cls.get_image_path = function
 
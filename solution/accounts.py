@@ -0,0 +1,106 @@
+"""
+Purge of every worker or employer account, for the staff "_all" delete.
+
+Accounts are deleted in keyset chunks, each in its own transaction together
+with the UPDATE clearing the matching User flag, so a purge holds locks for
+one chunk at a time and stays consistent if it stops halfway. It can run in
+the request or as a background task reporting progress through the cache.
+"""
+
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Callable
+
+from django.core.cache import cache
+from django.db import models, transaction
+
+from solution import media, tasks
+from solution.models import EmployerAccount, User, WorkerAccount
+
+CHUNK_SIZE = 1000
+
+# User flag of each account model, account primary keys are user ids
+ACCOUNT_FLAGS: dict[type[models.Model], str] = {
+    WorkerAccount: "has_worker_account",
+    EmployerAccount: "has_employer_account",
+}
+
+# Seconds the progress of a background purge stays readable
+PROGRESS_TIMEOUT = 24 * 60 * 60
+
+
+@dataclass
+class PurgeProgress:
+    id: str
+    model: str
+    total: int
+    deleted: int = 0
+    done: bool = False
+    failed: bool = False
+
+
+def purge_accounts(
+    model: type[models.Model],
+    chunk_size: int = CHUNK_SIZE,
+    on_progress: Callable[[int], None] | None = None,
+) -> int:
+    flag = ACCOUNT_FLAGS[model]
+    deleted = 0
+    last_pk = None
+
+    while True:
+        queryset = model.objects.order_by("pk")
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+
+        pks = list(queryset.values_list("pk", flat=True)[:chunk_size])
+        if not pks:
+            return deleted
+
+        # The image files of the whole chunk are collected at once
+        with transaction.atomic(), media.collecting():
+            model.objects.filter(pk__in=pks).delete()
+            User.objects.filter(pk__in=pks).update(**{flag: False})
+
+        deleted += len(pks)
+        last_pk = pks[-1]
+        if on_progress is not None:
+            on_progress(deleted)
+
+
+def progress_key(purge_id: str) -> str:
+    return f"account-purge:{purge_id}"
+
+
+def get_progress(purge_id: str) -> PurgeProgress | None:
+    progress = cache.get(progress_key(purge_id))
+    return PurgeProgress(**progress) if progress is not None else None
+
+
+def save_progress(progress: PurgeProgress):
+    cache.set(progress_key(progress.id), asdict(progress), PROGRESS_TIMEOUT)
+
+
+def run_purge(progress: PurgeProgress, model: type[models.Model], chunk_size: int):
+    def on_progress(deleted):
+        progress.deleted = deleted
+        save_progress(progress)
+
+    try:
+        purge_accounts(model, chunk_size, on_progress)
+    except Exception:
+        progress.failed = True
+        raise
+    else:
+        progress.done = True
+    finally:
+        save_progress(progress)
+
+
+def start_purge(model: type[models.Model], chunk_size: int = CHUNK_SIZE) -> PurgeProgress:
+    progress = PurgeProgress(
+        id=uuid.uuid4().hex, model=model._meta.model_name, total=model.objects.count()
+    )
+    save_progress(progress)
+    tasks.on_commit(run_purge, progress, model, chunk_size)
+    return progress
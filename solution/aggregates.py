@@ -0,0 +1,88 @@
+"""
+Denormalized counters and rating aggregates on account models.
+
+Every change is applied as a single UPDATE with F() arithmetic, so concurrent
+writers never lose an increment. The signal handlers in solution.signals keep
+them current and the reconcile functions recompute them from scratch.
+"""
+from typing import Iterable
+
+from django.db import models
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, Greatest
+
+from solution import models as app_models
+
+# Account model rated by each feedback model, and the feedback field pointing to it
+rated_accounts: dict[type[models.Model], tuple[type[models.Model], str]] = {
+    app_models.EmployerFeedback: (app_models.WorkerAccount, "worker"),
+    app_models.WorkerFeedback: (app_models.EmployerAccount, "employer"),
+}
+
+
+def average(total, count):
+    return Cast(total, FloatField()) / Greatest(count, 1)
+
+
+def add_rating(model: type[models.Model], pk: int, rating_delta: int, count_delta: int):
+    """
+    Add ``rating_delta`` to the rating sum and ``count_delta`` to the review count
+    of an account, recomputing its average in the same statement
+    """
+    if not (rating_delta or count_delta):
+        return
+
+    # Every right-hand side reads the row as it was before the UPDATE
+    rating_sum = F("rating_sum") + rating_delta
+    review_count = F("review_count") + count_delta
+    model.objects.filter(pk=pk).update(
+        rating_sum=rating_sum, review_count=review_count, rating=average(rating_sum, review_count)
+    )
+
+
+def add_jobs_done(worker_ids: Iterable[int] | models.QuerySet, delta: int):
+    if delta:
+        app_models.WorkerAccount.objects.filter(pk__in=worker_ids).update(
+            jobs_done=F("jobs_done") + delta
+        )
+
+
+def rating_updates(feedback_model: type[models.Model]) -> dict[str, models.Expression]:
+    """
+    UPDATE expressions recomputing the rating aggregates of the accounts rated by
+    ``feedback_model`` from its rows
+    """
+    _, field = rated_accounts[feedback_model]
+    feedbacks = feedback_model.objects.filter(**{field: OuterRef("pk")}).order_by().values(field)
+    rating_sum = Coalesce(Subquery(feedbacks.annotate(total=Sum("rating")).values("total")), 0)
+    review_count = Coalesce(Subquery(feedbacks.annotate(count=Count("pk")).values("count")), 0)
+
+    return {
+        "rating_sum": rating_sum,
+        "review_count": review_count,
+        "rating": average(rating_sum, review_count),
+    }
+
+
+def reconcile_worker_counters(queryset: models.QuerySet[app_models.WorkerAccount]) -> int:
+    """
+    Recompute the counters and rating of every worker in ``queryset`` with one UPDATE
+    """
+    jobs_done = (
+        app_models.Job.workers.through.objects.filter(workeraccount=OuterRef("pk"), job__done=True)
+        .order_by()
+        .values("workeraccount")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+
+    return queryset.update(
+        **rating_updates(app_models.EmployerFeedback), jobs_done=Coalesce(Subquery(jobs_done), 0)
+    )
+
+
+def reconcile_employer_counters(queryset: models.QuerySet[app_models.EmployerAccount]) -> int:
+    """
+    Recompute the rating of every employer in ``queryset`` with one UPDATE
+    """
+    return queryset.update(**rating_updates(app_models.WorkerFeedback))
@@ -1,23 +1,43 @@
+from dataclasses import asdict
+
+from django.contrib.auth import authenticate
 from django.db import models
 from django.http import Http404
+from django.http.response import HttpResponseBase
 from django.shortcuts import get_object_or_404
-from drf_spectacular.utils import OpenApiResponse, extend_schema
+from django.views.decorators.http import condition
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
 from rest_framework import generics, permissions, status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import AuthenticationFailed, Throttled
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from rest_framework.serializers import Serializer
+from rest_framework.utils.urls import replace_query_param
 
+from solution import accounts, facets, ratelimit, search
 from solution import models as app_models
+from solution.api import authentication, bulk, reference
 from solution.api import serializers as app_serializers
-from solution.api.permissions import IsOwnerOrStaff
+from solution.api.pagination import JobFeedPagination, WorkerSearchPagination
+from solution.api.permissions import HasEmployerAccount, IsOwnerOrStaff
+from solution.api.renderers import PrerenderedResponse, StreamingListMixin
 
 
 class AuthRequest(Request):
     user: app_models.User
 
 
+def check_rate_limit(scope: str, request: Request, username: str | None = None):
+    """
+    Raise Throttled when the client IP or the username is over the limit of ``scope``
+    """
+    wait = ratelimit.attempt(scope, ratelimit.identities(request, username))
+    if wait is not None:
+        raise Throttled(wait)
+
+
 @extend_schema(responses=OpenApiResponse())
 @api_view(["GET"])
 def api_root(request):
@@ -25,42 +45,215 @@ def api_root(request):
         {
             "roles": reverse("solution:api:roles", request=request),
             "job-data": reverse("solution:api:job-data", request=request),
+            "jobs": reverse("solution:api:jobs", request=request),
+            "workers": reverse("solution:api:workers", request=request),
             "worker-account": reverse("solution:api:worker-account", request=request),
             "employer-account": reverse("solution:api:employer-account", request=request),
         }
     )
 
 
+@condition(etag_func=lambda request: reference.get("roles").etag)
 @extend_schema(responses=OpenApiResponse({"type": "array", "items": {"type": "string"}}))
 @api_view(["GET"])
 def roles(request):
-    roles = app_models.Profession.objects.all()
-    return Response([x.name for x in roles])
+    rendered = reference.get("roles")
+    return PrerenderedResponse(rendered.data, rendered.content)
 
 
+@condition(etag_func=lambda request: reference.get("job_data").etag)
 @extend_schema(responses=OpenApiResponse())
 @api_view(["GET"])
 def job_data(request):
-    job_types = app_models.JobType.objects.all()
-    shifts = app_models.Shift.objects.all()
-    days_schedule = app_models.DaysSchedule.objects.all()
-    tags = app_models.JobTag.objects.all()
+    rendered = reference.get("job_data")
+    return PrerenderedResponse(rendered.data, rendered.content)
 
-    return Response(
+
+def get_list_param(request: Request, name: str) -> list[str]:
+    """
+    Values of a repeated or comma separated query parameter
+    """
+    return [
+        item for value in request.query_params.getlist(name) for item in value.split(",") if item
+    ]
+
+
+job_filter_parameters = [
+    OpenApiParameter(name, str, many=True, description=f"Jobs with any of these {name}")
+    for name in facets.FILTERS
+]
+
+
+@extend_schema(parameters=job_filter_parameters)
+class JobListView(generics.ListAPIView):
+    """
+    Feed of open jobs, newest first
+    """
+
+    serializer_class = app_serializers.JobSerializer
+    pagination_class = JobFeedPagination
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self) -> models.QuerySet:
+        flags = {name: get_list_param(self.request, name) for name in facets.FILTERS}
+        return (
+            app_models.Job.objects.filter(done=False)
+            .with_flags(**flags)
+            .select_related("employer")
+            .prefetch_related("work_schedules")
+        )
+
+
+@extend_schema(responses=OpenApiResponse(bulk.response_schema))
+class JobBulkCreateView(bulk.BulkCreateView):
+    """
+    Post jobs of the employer account as newline delimited JSON
+    """
+
+    serializer_class = app_serializers.JobBulkSerializer
+    permission_classes = [HasEmployerAccount]
+    request: AuthRequest
+    queryset = app_models.Job.objects.all()
+
+    def build(self, validated_data) -> app_models.Job:
+        job = app_models.Job(employer=self.request.user.employer_account, **validated_data)
+        job.sync_flags()
+        return job
+
+    def after_bulk_create(self, objs):
+        search.index_jobs(objs)
+
+
+@extend_schema(
+    parameters=job_filter_parameters,
+    responses=OpenApiResponse(
         {
-            "job_types": [x.name for x in job_types],
-            "shifts": [x.name for x in shifts],
-            "days_schedule": [x.name for x in days_schedule],
-            "tags": [x.name for x in tags],
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "additionalProperties": {"type": "integer"},
+            },
         }
+    ),
+)
+@api_view(["GET"])
+def job_facets(request):
+    """
+    Number of open jobs matching the filters for every filter value
+    """
+    filters = {name: get_list_param(request, name) for name in facets.FILTERS}
+    return Response(facets.job_facets(filters))
+
+
+class JobSearchView(generics.GenericAPIView):
+    """
+    Open jobs matching a free-text query, best match first
+    """
+
+    serializer_class = app_serializers.JobSerializer
+    permission_classes = [permissions.AllowAny]
+    page_size = 20
+    max_page_size = 100
+
+    def get_int_param(self, name: str, default: int, maximum: int | None = None) -> int:
+        try:
+            value = max(int(self.request.query_params[name]), 0)
+        except (KeyError, ValueError):
+            return default
+
+        return min(value, maximum) if maximum is not None else value
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter("q", str, description="Free-text query"),
+            OpenApiParameter("limit", int),
+            OpenApiParameter("offset", int),
+        ]
     )
+    def get(self, request: Request) -> Response:
+        limit = self.get_int_param("limit", self.page_size, self.max_page_size) or self.page_size
+        offset = self.get_int_param("offset", 0)
+
+        # One extra hit tells if there is a next page
+        ranked = search.search_jobs(request.query_params.get("q", ""), limit + 1, offset)
+        has_next = len(ranked) > limit
+        ids = [pk for pk, _ in ranked[:limit]]
+
+        jobs = (
+            app_models.Job.objects.filter(done=False)  # Finished since the search ran
+            .select_related("employer")
+            .prefetch_related("work_schedules")
+            .in_bulk(ids)
+        )
+        results = [jobs[pk] for pk in ids if pk in jobs]
+
+        next_link = None
+        if has_next:
+            next_link = replace_query_param(request.build_absolute_uri(), "offset", offset + limit)
+
+        return Response(
+            {"next": next_link, "results": self.get_serializer(results, many=True).data},
+            status=status.HTTP_200_OK,
+        )
+
+
+def parse_bool(value: str | None) -> bool | None:
+    if value is None:
+        return None
+
+    return value.lower() in ("1", "true", "yes")
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter("roles", str, many=True, description="Profession names"),
+        OpenApiParameter("minRating", float),
+        OpenApiParameter("verifiedId", bool),
+        OpenApiParameter("drivingLicense", bool),
+    ]
+)
+class WorkerSearchView(generics.ListAPIView):
+    """
+    Worker profiles matching the find-workers filters, best rated first
+    """
+
+    serializer_class = app_serializers.WorkerCardSerializer
+    pagination_class = WorkerSearchPagination
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self) -> models.QuerySet:
+        params = self.request.query_params
+        queryset = app_models.WorkerAccount.objects.select_related("profession")
+
+        roles = get_list_param(self.request, "roles")
+        if roles:
+            # Resolve names first so the filter runs on the indexed profession_id
+            profession_ids = app_models.Profession.objects.filter(name__in=roles).values_list(
+                "id", flat=True
+            )
+            queryset = queryset.filter(profession_id__in=list(profession_ids))
+
+        try:
+            min_rating = float(params["minRating"])
+        except (KeyError, ValueError):
+            pass
+        else:
+            queryset = queryset.filter(rating__gte=min_rating)
+
+        for param, field in (("verifiedId", "verified_id"), ("drivingLicense", "driving_license")):
+            # Unchecked filters mean "any", not "false"
+            if parse_bool(params.get(param)):
+                queryset = queryset.filter(**{field: True})
 
+        return queryset
 
-class AccountView(generics.GenericAPIView):
+
+class AccountView(StreamingListMixin, generics.GenericAPIView):
     model = models.Model
     serializer_class: Serializer
     permission_classes = [permissions.IsAuthenticated & IsOwnerOrStaff]
     request: AuthRequest
+    projected = True
 
     def __get_object_or_404(self, Model: models.Model, *args, **kwargs):
         try:
@@ -93,17 +286,15 @@ class AccountView(generics.GenericAPIView):
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-    def get(self, request, username=None) -> Response:
+    def get(self, request, username=None) -> HttpResponseBase:
         if username:
             return Response(
                 self.get_serializer(self.get_object(username)).data,
                 status=status.HTTP_200_OK,
             )
         else:
-            return Response(
-                self.get_serializer(self.get_queryset(), many=True).data,
-                status=status.HTTP_200_OK,
-            )
+            # Staff listings span every account, stream them as JSON or NDJSON
+            return self.stream(self.get_queryset())
 
     def post(self, request: AuthRequest):
         serializer = self.get_serializer(data=request.data, context={"request": request})
@@ -126,16 +317,16 @@ class AccountView(generics.GenericAPIView):
 
     def delete(self, request: AuthRequest, username=None):
         if username == "_all" and request.user.is_staff:
-            self.get_queryset().delete()
-            all_users = app_models.User.objects.all()
-            for user in all_users:
-                user.has_worker_account = False
-                user.has_employer_account = False
-                user.save()
-
-            app_models.User.objects.bulk_update(
-                all_users, ["has_worker_account", "has_employer_account"]
-            )
+            if parse_bool(request.query_params.get("background")):
+                progress = accounts.start_purge(self.model)
+                url = reverse("solution:api:account-purge", args=[progress.id], request=request)
+                return Response(
+                    {**asdict(progress), "url": url},
+                    status=status.HTTP_202_ACCEPTED,
+                    headers={"Location": url},
+                )
+
+            accounts.purge_accounts(self.model)
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         self.get_object(username).delete()
@@ -150,6 +341,35 @@ class AccountView(generics.GenericAPIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@extend_schema(responses=OpenApiResponse())
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def account_purge(request, purge_id):
+    """
+    Progress of a background "_all" account delete
+    """
+    progress = accounts.get_progress(purge_id)
+    if progress is None:
+        raise Http404("No account purge matches the given id.")
+
+    return Response(asdict(progress))
+
+
+@extend_schema(
+    responses=OpenApiResponse(
+        {"type": "object", "additionalProperties": {"type": "integer"}},
+        description="Attempts rejected by each rate limit",
+    )
+)
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def rate_limits(request):
+    """
+    Number of password attempts shed by each rate limit
+    """
+    return Response(ratelimit.shed_counts())
+
+
 class WorkerAccountView(AccountView):
     """
     A simple view to create and edit personal accounts
@@ -174,12 +394,107 @@ class EmployerAccountView(AccountView):
         return self.model.objects.select_related("user")
 
 
+class AccountBulkCreateView(bulk.BulkCreateView):
+    """
+    Staff import of accounts for existing users as newline delimited JSON,
+    one account per line with the ``user`` username
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def after_bulk_create(self, objs):
+        flag = accounts.ACCOUNT_FLAGS[self.queryset.model]
+        app_models.User.objects.filter(pk__in=[x.user_id for x in objs]).update(**{flag: True})
+
+
+@extend_schema(responses=OpenApiResponse(bulk.response_schema))
+class WorkerAccountBulkCreateView(AccountBulkCreateView):
+    serializer_class = app_serializers.WorkerAccountBulkSerializer
+    queryset = app_models.WorkerAccount.objects.all()
+
+
+@extend_schema(responses=OpenApiResponse(bulk.response_schema))
+class EmployerAccountBulkCreateView(AccountBulkCreateView):
+    serializer_class = app_serializers.EmployerAccountBulkSerializer
+    queryset = app_models.EmployerAccount.objects.all()
+
+
 class ChangePasswordView(generics.GenericAPIView):
     serializer_class = app_serializers.ChangePasswordSerializer
 
     def patch(self, request: AuthRequest) -> Response:
+        check_rate_limit("change-password", request, request.user.username)
         serializer = self.get_serializer(data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
         request.user.set_password(serializer.validated_data["new_password"])
         request.user.save()
+        authentication.revoke_user(request.user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TokenView(generics.GenericAPIView):
+    """
+    Exchange a username and password for an access and a refresh token
+    """
+
+    serializer_class = app_serializers.TokenObtainSerializer
+    authentication_classes = [authentication.SignedTokenAuthentication]
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(responses=app_serializers.TokenPairSerializer)
+    def post(self, request: Request) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        check_rate_limit("login", request, serializer.validated_data["username"])
+        user = authenticate(
+            request,
+            username=serializer.validated_data["username"],
+            password=serializer.validated_data["password"],
+        )
+        if user is None:
+            raise AuthenticationFailed("Invalid username or password.")
+
+        pair = authentication.issue_pair(user)
+        return Response(app_serializers.TokenPairSerializer(pair).data)
+
+
+class TokenRefreshView(generics.GenericAPIView):
+    """
+    Exchange a refresh token for a new pair, the old refresh token is used up.
+    Presenting a used refresh token revokes every token of its login.
+    """
+
+    serializer_class = app_serializers.TokenRefreshSerializer
+    authentication_classes = [authentication.SignedTokenAuthentication]
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(responses=app_serializers.TokenPairSerializer)
+    def post(self, request: Request) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        token = authentication.verify(serializer.validated_data["refresh"], authentication.REFRESH)
+        pair = authentication.rotate(token)
+        return Response(app_serializers.TokenPairSerializer(pair).data)
+
+
+class TokenRevokeView(generics.GenericAPIView):
+    """
+    Revoke the access token of the request and the refresh token in the body
+    """
+
+    serializer_class = app_serializers.TokenRevokeSerializer
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(responses={204: None})
+    def post(self, request: Request) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if isinstance(request.auth, authentication.Token):
+            authentication.revoke(request.auth)
+        if "refresh" in serializer.validated_data:
+            authentication.revoke(
+                authentication.verify(serializer.validated_data["refresh"], authentication.REFRESH)
+            )
+
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,207 @@
+"""
+Signed bearer tokens for API clients.
+
+Access and refresh tokens are django.core.signing payloads, so checking one
+costs an HMAC instead of a password hash. Passwords are only checked on login,
+behind solution.ratelimit. Revocations are RevokedToken rows, checked by the
+same query that loads the user. Tokens issued from one login share a family, a
+refresh token presented twice revokes its whole family.
+"""
+
+import datetime
+import secrets
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, Q
+from django.utils import timezone
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+from solution.models import RevokedToken, SaveMode, User
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+
+@dataclass(frozen=True)
+class Token:
+    id: str
+    kind: str
+    user_id: int
+    family: str
+    # Unix time in milliseconds
+    issued: int
+
+
+def lifetime(kind: str) -> int:
+    """
+    Seconds a token of ``kind`` stays valid
+    """
+    if kind == ACCESS:
+        return settings.API_ACCESS_TOKEN_LIFETIME
+    return settings.API_REFRESH_TOKEN_LIFETIME
+
+
+def now() -> int:
+    return int(time.time() * 1000)
+
+
+def salt(kind: str) -> str:
+    # A token of one kind can't be verified as the other
+    return f"solution.api.authentication.{kind}"
+
+
+def token_key(token_id: str) -> str:
+    return f"token:{token_id}"
+
+
+def family_key(family: str) -> str:
+    return f"family:{family}"
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def issue(user: User, kind: str, family: str) -> str:
+    payload = {"j": secrets.token_urlsafe(12), "u": user.pk, "f": family, "i": now()}
+    return signing.dumps(payload, salt=salt(kind))
+
+
+def issue_pair(user: User, family: str | None = None) -> dict:
+    """
+    New access and refresh tokens, in a new family unless rotating one
+    """
+    family = family or secrets.token_urlsafe(12)
+    return {
+        "access": issue(user, ACCESS, family),
+        "refresh": issue(user, REFRESH, family),
+        "expires_in": lifetime(ACCESS),
+    }
+
+
+def verify(value: str, kind: str) -> Token:
+    """
+    Check the signature and age of a token, get_user checks revocations
+    """
+    try:
+        payload = signing.loads(value, salt=salt(kind), max_age=lifetime(kind))
+        return Token(payload["j"], kind, payload["u"], payload["f"], payload["i"])
+    except (signing.BadSignature, KeyError, TypeError):
+        raise AuthenticationFailed("Invalid or expired token.")
+
+
+def add_revocations(keys: list[str], issued_before: int, expires: datetime.datetime):
+    """
+    Store revocations, keeping the latest of a key revoked again
+    """
+    RevokedToken.objects.filter(expires__lt=timezone.now()).delete()
+    RevokedToken.objects.bulk_create(
+        [RevokedToken(key=key, issued_before=issued_before, expires=expires) for key in keys],
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["issued_before", "expires"],
+    )
+
+
+def latest_expiry() -> datetime.datetime:
+    """
+    When every token issued so far has expired
+    """
+    return timezone.now() + datetime.timedelta(seconds=max(lifetime(ACCESS), lifetime(REFRESH)) + 1)
+
+
+def token_expiry(token: Token) -> datetime.datetime:
+    issued = datetime.datetime.fromtimestamp(token.issued / 1000, datetime.UTC)
+    return issued + datetime.timedelta(seconds=lifetime(token.kind) + 1)
+
+
+def revoke(token: Token):
+    add_revocations([token_key(token.id)], now(), token_expiry(token))
+
+
+def revoke_family(token: Token):
+    """
+    Revoke every token issued from the same login as ``token``
+    """
+    add_revocations([family_key(token.family)], now(), latest_expiry())
+
+
+def revoke_user(user_id: int):
+    """
+    Revoke every token issued to the user so far
+    """
+    add_revocations([user_key(user_id)], now(), latest_expiry())
+
+
+def get_user(token: Token, check_token: bool = True) -> User:
+    revocations = RevokedToken.objects.filter(
+        Q(key=family_key(token.family))
+        | Q(key=user_key(token.user_id), issued_before__gt=token.issued)
+    )
+    if check_token:
+        revocations = revocations | RevokedToken.objects.filter(key=token_key(token.id))
+
+    user = (
+        User._default_manager.filter(pk=token.user_id).annotate(revoked=Exists(revocations)).first()
+    )
+    if user is None or not user.is_active:
+        raise AuthenticationFailed("User inactive or deleted.")
+
+    if user.revoked:
+        raise AuthenticationFailed("Token has been revoked.")
+
+    return user
+
+
+def rotate(token: Token) -> dict:
+    """
+    Use up a refresh token for a new pair in its family. A refresh token seen
+    twice was copied, by an attacker or by a client retrying, and which copy
+    is legitimate is unknown, so the whole family is revoked.
+    """
+    try:
+        with transaction.atomic():
+            # The primary key decides which of concurrent refreshes wins
+            RevokedToken(
+                key=token_key(token.id), issued_before=now(), expires=token_expiry(token)
+            ).save(force_insert=True, mode=SaveMode.TRUSTED)
+    except IntegrityError:
+        revoke_family(token)
+        raise AuthenticationFailed("Token has been revoked.")
+
+    return issue_pair(get_user(token, check_token=False), token.family)
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Clients authenticate with an access token from the tokens endpoint,
+    passed in the Authorization header:
+
+        Authorization: Bearer <access token>
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) != 2:
+            raise AuthenticationFailed("Invalid token header.")
+
+        try:
+            value = auth[1].decode("ascii")
+        except UnicodeError:
+            raise AuthenticationFailed("Invalid token header.")
+
+        token = verify(value, ACCESS)
+        return get_user(token), token
+
+    def authenticate_header(self, request):
+        return f'{self.keyword} realm="api"'
@@ -0,0 +1,142 @@
+"""
+Bulk creation from newline delimited JSON, one object per line.
+
+Lines are validated by the serializer in chunks, checked against the database
+with BaseModel.validate_batch and inserted with bulk_create, so a chunk costs a
+few queries instead of several per object. bulk_create skips save() and the
+model signals, views do their side effects in after_bulk_create.
+"""
+
+from typing import Any
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import models, transaction
+from rest_framework import generics, status
+from rest_framework.exceptions import ParseError
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from solution.api.parsers import NDJSONParser
+from solution.api.serializers import PrefetchedSlugRelatedField, snake_to_camel
+from solution.models import BaseModel, SaveMode
+from solution.utils import chunked
+
+
+response_schema = {
+    "type": "object",
+    "properties": {
+        "created": {"type": "integer"},
+        "errors": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "line": {"type": "integer"},
+                    "errors": {"type": "object", "additionalProperties": True},
+                },
+            },
+        },
+    },
+}
+
+
+def error_dict(errors: dict[str, Any]) -> dict[str, Any]:
+    """
+    Field errors keyed like the request body, in camelCase
+    """
+    return {
+        api_settings.NON_FIELD_ERRORS_KEY if key == NON_FIELD_ERRORS else snake_to_camel(key): value
+        for key, value in errors.items()
+    }
+
+
+class BulkCreateView(generics.GenericAPIView):
+    """
+    Creates one object per NDJSON line. Invalid lines are reported by line
+    number and the valid ones are created anyway.
+    """
+
+    parser_classes = [NDJSONParser]
+    chunk_size = 500
+    max_records = 10_000
+
+    related: dict[str, dict[Any, models.Model]] = {}
+
+    def get_serializer_context(self) -> dict[str, Any]:
+        return {**super().get_serializer_context(), "related": self.related}
+
+    def get_related(self, values: list[Any]) -> dict[str, dict[Any, models.Model]]:
+        """
+        Fetch the objects of every PrefetchedSlugRelatedField for a chunk, one query per field
+        """
+        related = {}
+        for name, field in self.get_serializer().fields.items():
+            if not isinstance(field, PrefetchedSlugRelatedField):
+                continue
+
+            key = snake_to_camel(name)
+            slugs = {x[key] for x in values if isinstance(x, dict) and isinstance(x.get(key), str)}
+            queryset = field.get_queryset().filter(**{f"{field.slug_field}__in": slugs})
+            related[name] = {getattr(obj, field.slug_field): obj for obj in queryset}
+
+        return related
+
+    def build(self, validated_data: dict[str, Any]) -> BaseModel:
+        return self.get_queryset().model(**validated_data)
+
+    def after_bulk_create(self, objs: list[BaseModel]):
+        pass
+
+    def post(self, request: Request) -> Response:
+        records = request.data
+        if not isinstance(records, list):
+            raise ParseError("Expected newline delimited JSON")
+        if len(records) > self.max_records:
+            raise ParseError(f"At most {self.max_records} lines can be sent at once")
+
+        model = self.get_queryset().model
+        created = 0
+        errors = []
+        for chunk in chunked(records, self.chunk_size):
+            self.related = self.get_related([value for _, value in chunk])
+
+            lines, objs = [], []
+            for line, value in chunk:
+                if isinstance(value, ParseError):
+                    errors.append(
+                        {
+                            "line": line,
+                            "errors": {api_settings.NON_FIELD_ERRORS_KEY: [value.detail]},
+                        }
+                    )
+                    continue
+
+                serializer = self.get_serializer(data=value)
+                if not serializer.is_valid():
+                    errors.append({"line": line, "errors": error_dict(serializer.errors)})
+                    continue
+
+                lines.append(line)
+                objs.append(self.build(serializer.validated_data))
+
+            invalid: dict[int, ValidationError] = model.validate_batch(objs, SaveMode.FULL)
+            for i, error in invalid.items():
+                errors.append({"line": lines[i], "errors": error_dict(error.message_dict)})
+
+            valid = [obj for i, obj in enumerate(objs) if i not in invalid]
+            if valid:
+                with transaction.atomic():
+                    model._default_manager.bulk_create(valid)
+                    self.after_bulk_create(valid)
+                created += len(valid)
+
+        errors.sort(key=lambda x: x["line"])
+        if not errors:
+            status_code = status.HTTP_201_CREATED
+        elif created:
+            status_code = status.HTTP_207_MULTI_STATUS
+        else:
+            status_code = status.HTTP_400_BAD_REQUEST
+
+        return Response({"created": created, "errors": errors}, status=status_code)
@@ -2,6 +2,8 @@ import orjson
 from drf_standardized_errors.formatter import ExceptionFormatter
 from drf_standardized_errors.types import Error, ErrorResponse
 
+from solution.api import serializers
+
 
 class MyExceptionFormatter(ExceptionFormatter):
     def format_error_response(self, error_response: ErrorResponse):
@@ -31,4 +33,4 @@ class MyExceptionFormatter(ExceptionFormatter):
 
     @staticmethod
     def snake_to_camel(s: str):
-        return s[0] + s.title().replace("_", "")[1:]
+        return serializers.snake_to_camel(s)
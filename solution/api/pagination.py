@@ -0,0 +1,154 @@
+import base64
+from typing import Any
+
+import orjson
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a fixed, unique ordering.
+
+    Pages are fetched with a ``(a, b) < (x, y)`` predicate built from the last
+    row of the previous page instead of an OFFSET, so every page costs the same
+    as the first one as long as an index matches ``ordering``. The last field
+    of ``ordering`` must be unique and no field may be nullable.
+    """
+
+    ordering: tuple[str, ...] = ("-pk",)
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "pageSize"
+    invalid_cursor_message = "Invalid cursor"
+
+    request: Request
+    next_position: list[str] | None
+
+    def paginate_queryset(self, queryset: models.QuerySet, request: Request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        model = queryset.model
+
+        queryset = queryset.order_by(*self.ordering)
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self.get_keyset_filter(model, self.decode_cursor(encoded)))
+
+        # Fetch one extra row to know if there is a next page without a COUNT
+        results = list(queryset[: self.page_size + 1])
+        has_next = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        self.next_position = self.get_position(model, results[-1]) if has_next else None
+        return results
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering_fields(self, model: type[models.Model]):
+        for name in self.ordering:
+            descending = name.startswith("-")
+            name = name.lstrip("-")
+            field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+            yield name, field, descending
+
+    def get_position(self, model: type[models.Model], obj: models.Model) -> list[str]:
+        return [field.value_to_string(obj) for _, field, _ in self.get_ordering_fields(model)]
+
+    def get_keyset_filter(self, model: type[models.Model], position: list[str]) -> Q:
+        fields = list(self.get_ordering_fields(model))
+        if len(position) != len(fields):
+            raise NotFound(self.invalid_cursor_message)
+
+        try:
+            values = [field.to_python(value) for (_, field, _), value in zip(fields, position)]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        # Expands (a, b, c) < (x, y, z) into
+        # a < x OR (a = x AND b < y) OR (a = x AND b = y AND c < z)
+        keyset = Q()
+        for i, (name, _, descending) in enumerate(fields):
+            lookup = {fields[j][0]: values[j] for j in range(i)}
+            lookup[f"{name}__{'lt' if descending else 'gt'}"] = values[i]
+            keyset |= Q(**lookup)
+
+        # Repeat the leading column as a plain range so the index is range scanned
+        name, _, descending = fields[0]
+        return Q(**{f"{name}__{'lte' if descending else 'gte'}": values[0]}) & keyset
+
+    def encode_cursor(self, position: list[str]) -> str:
+        return base64.urlsafe_b64encode(orjson.dumps(position)).decode("ascii")
+
+    def decode_cursor(self, encoded: str) -> list[str]:
+        try:
+            position = orjson.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        # Positions are built with value_to_string, see get_position
+        if not isinstance(position, list) or not all(isinstance(value, str) for value in position):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position
+
+    def get_next_link(self) -> str | None:
+        if self.next_position is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view) -> list[dict[str, Any]]:
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class JobFeedPagination(KeysetPagination):
+    ordering = ("-posted_date", "-id")
+
+
+class WorkerSearchPagination(KeysetPagination):
+    ordering = ("-rating", "pk")
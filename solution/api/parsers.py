@@ -1,3 +1,4 @@
+import re
 from typing import Any, Mapping, Optional
 
 import orjson
@@ -5,6 +6,21 @@ from django.conf import settings
 from rest_framework.exceptions import ParseError
 from rest_framework.parsers import BaseParser
 
+# orjson only reads UTF-8, bodies in another charset are transcoded first
+UTF8_NAMES = {"utf-8", "utf8"}
+
+non_space_re = re.compile(rb"\S")
+
+
+def read_utf8(stream, parser_context: Optional[Mapping[str, Any]]) -> bytes:
+    parser_context = parser_context or {}
+    encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+    data = stream.read()
+    if encoding.lower() not in UTF8_NAMES:
+        data = data.decode(encoding).encode()
+    return data
+
 
 class ORJSONParser(BaseParser):
     """
@@ -22,11 +38,54 @@ class ORJSONParser(BaseParser):
         """
         Parses the incoming bytestream as JSON and returns the resulting data.
         """
-        parser_context = parser_context or {}
-        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
-
         try:
-            data = stream.read().decode(encoding)
-            return orjson.loads(data)
+            # orjson reads the bytes directly, decoding to str first only copies the body
+            return orjson.loads(read_utf8(stream, parser_context))
         except ValueError as exc:
             raise ParseError("JSON parse error - %s" % str(exc))
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline delimited JSON, one value per line.
+    """
+
+    media_type: str = "application/x-ndjson"
+
+    def parse(
+        self,
+        stream,
+        media_type: Optional[str] = None,
+        parser_context: Optional[Mapping[str, Any]] = None,
+    ) -> list[tuple[int, Any]]:
+        """
+        Returns ``(line number, value)`` pairs, blank lines skipped. A line
+        that isn't valid JSON gets a ParseError as its value instead of
+        failing the whole body, so callers can report it with the line number.
+        """
+        try:
+            data = read_utf8(stream, parser_context)
+        except ValueError as exc:
+            raise ParseError("NDJSON parse error - %s" % str(exc))
+
+        # Lines are handed to orjson as memoryview slices of the body, not copies
+        view = memoryview(data)
+        records = []
+        start = 0
+        line = 0
+        while start < len(data):
+            end = data.find(b"\n", start)
+            if end == -1:
+                end = len(data)
+            line += 1
+
+            if non_space_re.search(data, start, end):
+                try:
+                    value = orjson.loads(view[start:end])
+                except orjson.JSONDecodeError as exc:
+                    value = ParseError("JSON parse error - %s" % str(exc))
+                records.append((line, value))
+
+            start = end + 1
+
+        return records
@@ -20,3 +20,14 @@ class IsOwnerOrStaff(BasePermission):
             return True
 
         return obj.user == request.user
+
+
+class HasEmployerAccount(BasePermission):
+    """
+    Only allow users with an employer account
+    """
+
+    message = "An employer account is required."
+
+    def has_permission(self, request: AuthRequest, view):
+        return bool(request.user.is_authenticated and request.user.has_employer_account)
@@ -0,0 +1,81 @@
+"""
+Pre-rendered reference data for the roles and job-data endpoints.
+
+The lists only change when staff edit Profession, JobType, Shift,
+DaysSchedule or JobTag, so each process renders them once and keeps the
+orjson bytes with their content hash as ETag. Edits bump a version number in
+the shared cache from the model signals, which makes every process rebuild.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import orjson
+from django.core.cache import cache
+from django.db import models
+
+from solution import models as app_models
+
+
+@dataclass(frozen=True)
+class Rendered:
+    data: Any
+    content: bytes
+    etag: str
+    version: int | None
+
+
+def names(model: type[models.Model]) -> list[str]:
+    return list(model.objects.order_by("pk").values_list("name", flat=True))
+
+
+builders: dict[str, Callable[[], Any]] = {
+    "roles": lambda: names(app_models.Profession),
+    "job_data": lambda: {
+        "job_types": names(app_models.JobType),
+        "shifts": names(app_models.Shift),
+        "days_schedule": names(app_models.DaysSchedule),
+        "tags": names(app_models.JobTag),
+    },
+}
+
+# Reference data built from each model
+dependents: dict[type[models.Model], tuple[str, ...]] = {
+    app_models.Profession: ("roles",),
+    app_models.JobType: ("job_data",),
+    app_models.Shift: ("job_data",),
+    app_models.DaysSchedule: ("job_data",),
+    app_models.JobTag: ("job_data",),
+}
+
+rendered: dict[str, Rendered] = {}
+
+
+def version_key(name: str) -> str:
+    return f"reference-data-version:{name}"
+
+
+def get(name: str) -> Rendered:
+    version = cache.get(version_key(name))
+    entry = rendered.get(name)
+    if entry is not None and entry.version == version:
+        return entry
+
+    data = builders[name]()
+    content = orjson.dumps(data)
+    entry = Rendered(data, content, f'"{hashlib.sha256(content).hexdigest()[:32]}"', version)
+    rendered[name] = entry
+    return entry
+
+
+def invalidate(name: str):
+    rendered.pop(name, None)
+
+    key = version_key(name)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted in between, any new value differs from what processes hold
+        cache.set(key, 1, timeout=None)
@@ -1,8 +1,25 @@
-from typing import Any, Mapping, Optional, Union
+import itertools
+from typing import Any, Iterable, Iterator, Mapping, Optional, Union
 
 import orjson
+from django.db import models
+from django.http import StreamingHttpResponse
+from django.http.response import HttpResponseBase
 from rest_framework.compat import parse_header_parameters
-from rest_framework.renderers import JSONRenderer
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+
+from solution.api.projection import Projection
+
+
+class PrerenderedResponse(Response):
+    """
+    Response carrying its own JSON rendering, which ORJSONRenderer sends as is
+    """
+
+    def __init__(self, data, content: bytes, **kwargs):
+        super().__init__(data, **kwargs)
+        self.prerendered_content = content
 
 
 class ORJSONRenderer(JSONRenderer):
@@ -42,6 +59,11 @@ class ORJSONRenderer(JSONRenderer):
         renderer_context = renderer_context or {}
 
         indent = self.get_indent(accepted_media_type, renderer_context)
+
+        prerendered = getattr(renderer_context.get("response"), "prerendered_content", None)
+        if prerendered is not None and not indent:
+            return prerendered
+
         options = None
         if indent:
             options = orjson.OPT_INDENT_2
@@ -49,3 +71,94 @@ class ORJSONRenderer(JSONRenderer):
         ret = orjson.dumps(data, option=options)
 
         return ret
+
+    def render_stream(
+        self,
+        batches: Iterable[Iterable[Any]],
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[bytes]:
+        """
+        Renders batches of items as one JSON array, a chunk of bytes per batch.
+        """
+        yield b"["
+        separator = b""
+        for batch in batches:
+            chunk = b",".join(orjson.dumps(item) for item in batch)
+            if chunk:
+                yield separator + chunk
+                separator = b","
+        yield b"]"
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Renderer which serializes to newline delimited JSON, one list item per line.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+
+        if not isinstance(data, list):
+            data = [data]
+        return b"".join(orjson.dumps(item) + b"\n" for item in data)
+
+    def render_stream(
+        self,
+        batches: Iterable[Iterable[Any]],
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[bytes]:
+        for batch in batches:
+            yield b"".join(orjson.dumps(item) + b"\n" for item in batch)
+
+
+class StreamingListMixin:
+    """
+    Streams list responses while the queryset is read, so memory stays flat
+    however many rows are returned. Needs a renderer with ``render_stream``,
+    others such as the browsable API get a regular Response.
+    """
+
+    stream_chunk_size = 500
+    # Read rows through a Projection instead of the serializer, for
+    # serializers made of plain fields, see solution.api.projection
+    projected = False
+
+    def stream(self, queryset: models.QuerySet) -> HttpResponseBase:
+        request = self.request
+        renderer = request.accepted_renderer
+        serializer = self.get_serializer(queryset, many=True)
+        if not hasattr(renderer, "render_stream"):
+            return Response(serializer.data)
+
+        if self.projected:
+            rows = Projection(serializer.child).rows(queryset, self.stream_chunk_size)
+            represent = None
+        else:
+            rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+            represent = serializer.child.to_representation
+
+        def batches():
+            while batch := list(itertools.islice(rows, self.stream_chunk_size)):
+                yield batch if represent is None else [represent(row) for row in batch]
+
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f"{content_type}; charset={renderer.charset}"
+
+        context = self.get_renderer_context()
+        return StreamingHttpResponse(
+            renderer.render_stream(batches(), request.accepted_media_type, context),
+            content_type=content_type,
+        )
@@ -0,0 +1,52 @@
+"""
+drf-spectacular hooks.
+"""
+
+from solution.api.serializers import CamelCaseSerializer, snake_to_camel
+
+
+def serializer_components() -> dict[str, type[CamelCaseSerializer]]:
+    """
+    CamelCaseSerializer subclasses by the component names drf-spectacular gives
+    them: the class name or Meta.ref_name without "Serializer", for partial
+    updates prefixed with "Patched" and for split request components suffixed
+    with "Request"
+    """
+    components = {}
+    pending = list(CamelCaseSerializer.__subclasses__())
+    while pending:
+        serializer = pending.pop()
+        pending.extend(serializer.__subclasses__())
+
+        name = getattr(getattr(serializer, "Meta", None), "ref_name", None) or serializer.__name__
+        name = name.removesuffix("Serializer")
+        for prefix in ("", "Patched"):
+            for suffix in ("", "Request"):
+                components[f"{prefix}{name}{suffix}"] = serializer
+
+    return components
+
+
+def camelize_serializer_fields(result, generator, request, public):
+    """
+    Rename the properties of CamelCaseSerializer components to the camelCase
+    keys the API sends and accepts, with the serializer's own field name map
+    """
+    serializers = serializer_components()
+    for component_name, schema in result.get("components", {}).get("schemas", {}).items():
+        serializer = serializers.get(component_name)
+        if serializer is None:
+            continue
+
+        names = serializer.camel_names
+        if "properties" in schema:
+            schema["properties"] = {
+                names.get(name) or snake_to_camel(name): value
+                for name, value in schema["properties"].items()
+            }
+        if "required" in schema:
+            schema["required"] = [
+                names.get(name) or snake_to_camel(name) for name in schema["required"]
+            ]
+
+    return result
@@ -1,28 +1,55 @@
-from typing import Any, OrderedDict
+import functools
+from typing import Any, Mapping, OrderedDict
 
 from django.contrib.auth.hashers import check_password
 from django.core.validators import RegexValidator
+from django.utils.encoding import smart_str
 from django.utils.translation import gettext_lazy as _
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
+from solution import images
 from solution import models as app_models
 
 
+# Field names are a small fixed set, the cache bounds the keys of request bodies
+@functools.lru_cache(maxsize=1024)
 def camel_to_snake(s: str):
     return "".join(["_" + c.lower() if c.isupper() else c for c in s.replace("_", "")]).lstrip("_")
 
 
+@functools.lru_cache(maxsize=1024)
 def snake_to_camel(s: str):
     return s[0] + s.title().replace("_", "")[1:]
 
 
 class CamelCaseSerializer(serializers.BaseSerializer):
+    # Field name maps of the serializer class, built once by __init_subclass__
+    camel_names: dict[str, str] = {}
+    snake_names: dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        names = list(getattr(cls, "_declared_fields", {}))
+        fields = getattr(getattr(cls, "Meta", None), "fields", None)
+        if isinstance(fields, (list, tuple)):
+            names += fields
+
+        cls.camel_names = {name: snake_to_camel(name) for name in names}
+        cls.snake_names = {camel: name for name, camel in cls.camel_names.items()}
+
     def to_representation(self, instance: Any) -> Any:
         resp_dict: OrderedDict[str, Any] = super().to_representation(instance)
-        return {snake_to_camel(k): v for k, v in resp_dict.items()}
+        names = self.camel_names
+        return {names.get(k) or snake_to_camel(k): v for k, v in resp_dict.items()}
 
     def to_internal_value(self, data: dict[str, Any]) -> Any:
-        req_dict = {camel_to_snake(k): v for k, v in data.items()}
+        if not isinstance(data, Mapping):
+            # Let the serializer reject it with its "Expected a dictionary" error
+            return super().to_internal_value(data)
+
+        names = self.snake_names
+        req_dict = {names.get(k) or camel_to_snake(k): v for k, v in data.items()}
         # logger = logging.getLogger("solution.request")
         # logger.debug(pprint.pformat(req_dict, indent=2, sort_dicts=False))
 
@@ -37,6 +64,50 @@ class CustomSerializer(CamelCaseSerializer, serializers.Serializer):
     pass
 
 
+@extend_schema_field({"type": "string", "format": "uri", "nullable": True})
+class ImageVariantField(serializers.Field):
+    """
+    URL of a resized variant of the image field with the same name, or of the
+    original file until the variants are rendered
+    """
+
+    def __init__(self, variant: str, **kwargs):
+        self.variant = variant
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        file = getattr(instance, self.field_name)
+        if not file:
+            return None
+
+        name = images.variant_name(getattr(instance, f"{self.field_name}_variants"), self.variant)
+        url = file.storage.url(name) if name else file.url
+
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request is not None else url
+
+
+class PrefetchedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField that looks values up in ``context["related"][field_name]``
+    when the view has fetched them for a whole batch, see BulkCreateView
+    """
+
+    def to_internal_value(self, data):
+        related = self.context.get("related", {}).get(self.field_name)
+        if related is None:
+            return super().to_internal_value(data)
+
+        try:
+            return related[data]
+        except KeyError:
+            self.fail("does_not_exist", slug_name=self.slug_field, value=smart_str(data))
+        except TypeError:
+            self.fail("invalid")
+
+
 class WorkerAccountSerializer(CustomModelSerializer):
     class Meta:
         model = app_models.WorkerAccount
@@ -57,6 +128,7 @@ class WorkerAccountSerializer(CustomModelSerializer):
             "jobs_done",
             "last_update",
         ]
+        read_only_fields = ["rating", "review_count", "jobs_done"]
 
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
     profession = serializers.SlugRelatedField(
@@ -64,6 +136,31 @@ class WorkerAccountSerializer(CustomModelSerializer):
     )
 
 
+class WorkerCardSerializer(CustomModelSerializer):
+    class Meta:
+        model = app_models.WorkerAccount
+        fields = [
+            "id",
+            "photo",
+            "profession",
+            "first_name",
+            "last_name",
+            "rating",
+            "location",
+            "about",
+            "verified_id",
+            "driving_license",
+            "review_count",
+            "jobs_done",
+            "last_update",
+        ]
+        read_only_fields = fields
+
+    id = serializers.IntegerField(source="user_id", read_only=True)
+    photo = ImageVariantField("thumbnail")
+    profession = serializers.SlugRelatedField(slug_field="name", read_only=True)
+
+
 class EmployerAccountSerializer(CustomModelSerializer):
     class Meta:
         model = app_models.EmployerAccount
@@ -84,12 +181,85 @@ class EmployerAccountSerializer(CustomModelSerializer):
             "last_name",
             "phone",
             "verified_id",
+            "rating",
+            "review_count",
             "last_update",
         ]
+        read_only_fields = ["rating", "review_count"]
 
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
 
+class JobEmployerSerializer(CustomModelSerializer):
+    class Meta:
+        model = app_models.EmployerAccount
+        fields = ["company_name", "logo", "description", "verified_id"]
+        read_only_fields = fields
+
+    logo = ImageVariantField("thumbnail")
+
+
+class WorkSchedulesSerializer(CustomModelSerializer):
+    class Meta:
+        model = app_models.WorkSchedules
+        fields = ["schedules", "time_from", "time_to"]
+
+
+class JobSerializer(CustomModelSerializer):
+    class Meta:
+        model = app_models.Job
+        fields = [
+            "id",
+            "title",
+            "employer",
+            "start_date",
+            "end_date",
+            "description",
+            "location",
+            "types",
+            "shifts",
+            "responsibilities",
+            "qualifications",
+            "benefits",
+            "min_salary",
+            "max_salary",
+            "period_salary",
+            "application_instructions",
+            "tags",
+            "work_schedules",
+            "posted_date",
+        ]
+
+    employer = JobEmployerSerializer(read_only=True)
+    work_schedules = WorkSchedulesSerializer(many=True, read_only=True)
+
+
+class JobBulkSerializer(JobSerializer):
+    class Meta(JobSerializer.Meta):
+        fields = [x for x in JobSerializer.Meta.fields if x not in ("employer", "work_schedules")]
+        read_only_fields = ["id"]
+
+
+class WorkerAccountBulkSerializer(WorkerAccountSerializer):
+    class Meta(WorkerAccountSerializer.Meta):
+        # Files can't be sent as JSON
+        fields = [x for x in WorkerAccountSerializer.Meta.fields if x != "photo"]
+
+    user = PrefetchedSlugRelatedField(slug_field="username", queryset=app_models.User.objects.all())
+    profession = PrefetchedSlugRelatedField(
+        slug_field="name", queryset=app_models.Profession.objects.all()
+    )
+
+
+class EmployerAccountBulkSerializer(EmployerAccountSerializer):
+    class Meta(EmployerAccountSerializer.Meta):
+        fields = [
+            x for x in EmployerAccountSerializer.Meta.fields if x not in ("logo", "personal_photo")
+        ]
+
+    user = PrefetchedSlugRelatedField(slug_field="username", queryset=app_models.User.objects.all())
+
+
 class ChangePasswordSerializer(CustomSerializer):
     """
     This regular expression breaks down as follows:
@@ -119,3 +289,22 @@ class ChangePasswordSerializer(CustomSerializer):
             raise serializers.ValidationError(_("Passwords don't match."))
 
         return data
+
+
+class TokenObtainSerializer(CustomSerializer):
+    username = serializers.CharField()
+    password = serializers.CharField(write_only=True, style={"input_type": "password"})
+
+
+class TokenRefreshSerializer(CustomSerializer):
+    refresh = serializers.CharField()
+
+
+class TokenRevokeSerializer(CustomSerializer):
+    refresh = serializers.CharField(required=False)
+
+
+class TokenPairSerializer(CustomSerializer):
+    access = serializers.CharField(read_only=True)
+    refresh = serializers.CharField(read_only=True)
+    expires_in = serializers.IntegerField(read_only=True, help_text="Seconds until access expires")
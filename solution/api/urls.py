@@ -9,6 +9,11 @@ urlpatterns = [
     path("", api_views.api_root, name="api-root"),
     path("roles", api_views.roles, name="roles"),
     path("job-data", api_views.job_data, name="job-data"),
+    path("jobs", api_views.JobListView.as_view(), name="jobs"),
+    path("jobs/bulk", api_views.JobBulkCreateView.as_view(), name="job-bulk"),
+    path("jobs/search", api_views.JobSearchView.as_view(), name="job-search"),
+    path("jobs/facets", api_views.job_facets, name="job-facets"),
+    path("workers", api_views.WorkerSearchView.as_view(), name="workers"),
     path("worker-account", api_views.WorkerAccountView.as_view(), name="worker-account"),
     path(
         "worker-account/<str:username>",
@@ -21,6 +26,21 @@ urlpatterns = [
         api_views.EmployerAccountView.as_view(),
         name="employer-account",
     ),
+    path(
+        "worker-accounts/bulk",
+        api_views.WorkerAccountBulkCreateView.as_view(),
+        name="worker-account-bulk",
+    ),
+    path(
+        "employer-accounts/bulk",
+        api_views.EmployerAccountBulkCreateView.as_view(),
+        name="employer-account-bulk",
+    ),
+    path("account-purges/<str:purge_id>", api_views.account_purge, name="account-purge"),
+    path("rate-limits", api_views.rate_limits, name="rate-limits"),
+    path("tokens", api_views.TokenView.as_view(), name="tokens"),
+    path("tokens/refresh", api_views.TokenRefreshView.as_view(), name="token-refresh"),
+    path("tokens/revoke", api_views.TokenRevokeView.as_view(), name="token-revoke"),
     path("change-password", api_views.ChangePasswordView.as_view(), name="change-password"),
     path("schema", SpectacularAPIView.as_view(), name="schema"),
     path("docs", SpectacularSwaggerView.as_view(url_name="solution:api:schema"), name="swagger-ui"),
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SolutionConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "solution"
+
+    def ready(self):
+        from solution import signals  # noqa: F401
@@ -0,0 +1,73 @@
+"""
+Per-value job counts for the job filter modal.
+
+Counts come from one GROUP BY over the Job flag masks and one pass of
+conditional counts over work schedules, instead of a COUNT per value.
+Results are cached per filter combination for JOB_FACETS_CACHE_TIMEOUT.
+"""
+import hashlib
+
+import orjson
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from django.db.models import Count, F
+from django.db.models.lookups import GreaterThan
+
+from solution import models as app_models
+from solution import validators as app_validators
+from solution.utils import from_bitmask
+
+FILTERS = (*app_models.Job.FLAG_CHOICES, "schedules")
+
+
+def count_job_flags(jobs: models.QuerySet[app_models.Job]) -> dict[str, dict[str, int]]:
+    """
+    Jobs per type, shift and tag. Rows are grouped by mask combination, which are
+    few, and expanded to values here.
+    """
+    fields = app_models.Job.FLAG_CHOICES
+    counts = {field: dict.fromkeys(choices, 0) for field, choices in fields.items()}
+
+    rows = jobs.order_by().values(*(f"{field}_mask" for field in fields)).annotate(n=Count("pk"))
+    for row in rows:
+        for field, choices in fields.items():
+            for value in from_bitmask(row[f"{field}_mask"], choices):
+                counts[field][value] += row["n"]
+
+    return counts
+
+
+def count_schedules(jobs: models.QuerySet[app_models.Job]) -> dict[str, int]:
+    """
+    Jobs per schedule. A job may have several work schedules, so jobs are counted
+    distinct per value.
+    """
+    choices = app_validators.SCHEDULE
+    counts = app_models.WorkSchedules.objects.filter(job__in=jobs.values("pk")).aggregate(
+        **{
+            f"schedule_{i}": Count(
+                "job", distinct=True, filter=GreaterThan(F("schedules_mask").bitand(1 << i), 0)
+            )
+            for i in range(len(choices))
+        }
+    )
+
+    return {choice: counts[f"schedule_{i}"] for i, choice in enumerate(choices)}
+
+
+def job_facets(filters: dict[str, list[str]]) -> dict[str, dict[str, int]]:
+    """
+    Counts of open jobs matching ``filters`` for every type, shift, tag and schedule
+    """
+    normalized = {name: sorted(set(filters[name])) for name in FILTERS if filters.get(name)}
+    digest = hashlib.md5(orjson.dumps(normalized, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    key = f"job-facets:{digest}"
+
+    facets = cache.get(key)
+    if facets is None:
+        jobs = app_models.Job.objects.filter(done=False).with_flags(**normalized)
+        facets = {**count_job_flags(jobs), "schedules": count_schedules(jobs)}
+        cache.set(key, facets, settings.JOB_FACETS_CACHE_TIMEOUT)
+
+    return facets
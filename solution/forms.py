@@ -2,6 +2,7 @@ from uuid import uuid4
 
 from django import forms
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.utils.translation import (
     gettext_lazy as _,
 )
@@ -10,6 +11,10 @@ from solution.models import User
 
 from .validators import UsernameEmailValidator
 
+# Names the database reports when an INSERT breaks one of the User unique indexes
+EMAIL_CONSTRAINT = "user_email_ci_unique"
+USERNAME_CONSTRAINTS = ("user_username_ci_unique", "username")
+
 
 class UsernameEmailField(forms.CharField):
     def validate(self, value: str) -> None:
@@ -30,23 +35,6 @@ class RegisterForm(forms.Form):
     password = forms.CharField(min_length=3)
     confirmation = forms.CharField(min_length=3)
 
-    def clean_email(self):
-        email: str = self.cleaned_data["email"]
-        if User.objects.filter(email=email).exists():
-            raise ValidationError(
-                _("A user with this email already exists"),
-                code="email_exists",
-            )
-
-        return email
-
-    def clean_username(self):
-        username: str = self.cleaned_data["username"]
-        if User.objects.filter(username=username).exists():
-            return f"{username}_{uuid4()}"
-
-        return username
-
     def clean(self):
         cleaned_data = super().clean()
 
@@ -63,3 +51,36 @@ class RegisterForm(forms.Form):
             self.add_error("confirmation", error)
 
         return cleaned_data
+
+    def save(self) -> User | None:
+        """
+        Create the user with a single INSERT, the unique indexes stand in for
+        checking first. A taken email becomes a form error and None is
+        returned, a taken username is retried once with a random suffix.
+        """
+        email = User.objects.normalize_email(self.cleaned_data["email"])
+        username: str = self.cleaned_data["username"]
+
+        user = User(email=email)
+        user.set_password(self.cleaned_data["password"])
+        for candidate in (username, f"{username}_{uuid4()}"):
+            user.username = User.normalize_username(candidate)
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+                return user
+            except IntegrityError as e:
+                if EMAIL_CONSTRAINT in str(e):
+                    self.add_error(
+                        "email",
+                        ValidationError(
+                            _("A user with this email already exists"),
+                            code="email_exists",
+                        ),
+                    )
+                    return None
+                if not any(name in str(e) for name in USERNAME_CONSTRAINTS):
+                    raise
+
+        self.add_error("username", ValidationError(_("This username is taken"), code="taken"))
+        return None
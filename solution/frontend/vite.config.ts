@@ -6,7 +6,8 @@ import million from "million/compiler";
 export default defineConfig({
   // plugins: [react()],
   plugins: [million.vite({ auto: false }), react()],
-  base: "/static/",
+  // STATIC_URL + DJANGO_VITE "static_url_prefix", chunks are loaded from there
+  base: "/static/solution/",
   server: {
     origin: "http://localhost:5173",
   },
@@ -15,8 +16,8 @@ export default defineConfig({
     target: "esnext",
     outDir: "../static/solution",
     emptyOutDir: true,
-    // generate manifest.json in outDir
-    manifest: true,
+    // generate manifest.json in outDir, read by django_vite
+    manifest: "manifest.json",
     rollupOptions: {
       // overwrite default .html entry
       input: {
@@ -0,0 +1,141 @@
+"""
+Resized WebP and AVIF variants of account photos and logos.
+
+Each image field has a ``<field>_variants`` JSONField mapping variant name to
+format to the stored file name. Variants are rendered in a process pool after
+an upload commits, until then serializers fall back to the original file.
+AVIF is only produced when Pillow can encode it.
+"""
+
+import contextlib
+import io
+from pathlib import PurePosixPath
+from typing import Any
+
+from django.core.files.base import ContentFile
+from django.db import DEFAULT_DB_ALIAS, models
+from PIL import Image, ImageOps
+
+with contextlib.suppress(ImportError):
+    import pillow_avif  # noqa: F401
+
+from solution import tasks
+from solution.storage import ContentAddressedStorage
+
+# Largest side in pixels. Thumbnails are list avatars and job card logos,
+# cards are profile headers and full is the largest size ever shown.
+VARIANTS = {"thumbnail": 128, "card": 400, "full": 1600}
+
+FORMATS = ("avif", "webp")
+SAVE_OPTIONS = {"avif": {"quality": 60}, "webp": {"quality": 80, "method": 6}}
+
+# Image fields with variants, by model label
+IMAGE_FIELDS = {
+    "solution.WorkerAccount": ("photo",),
+    "solution.EmployerAccount": ("logo", "personal_photo"),
+}
+
+
+def available_formats() -> tuple[str, ...]:
+    extensions = Image.registered_extensions()
+    return tuple(fmt for fmt in FORMATS if extensions.get(f".{fmt}") in Image.SAVE)
+
+
+def render_variants(source: str | bytes, formats: tuple[str, ...]) -> dict[str, dict[str, bytes]]:
+    """
+    Encode every variant of the image at path or with content ``source``.
+    Runs in the process pool, so it only uses Pillow.
+    """
+    with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as image:
+        image = ImageOps.exif_transpose(image)
+        transparent = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if transparent else "RGB")
+
+        rendered: dict[str, dict[str, bytes]] = {}
+        for variant, size in VARIANTS.items():
+            resized = image.copy()
+            # Never upscale, smaller originals give identical variants
+            resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+            rendered[variant] = {}
+            for fmt in formats:
+                buffer = io.BytesIO()
+                resized.save(buffer, fmt.upper(), **SAVE_OPTIONS[fmt])
+                rendered[variant][fmt] = buffer.getvalue()
+
+    return rendered
+
+
+def variant_path(name: str, variant: str, fmt: str) -> str:
+    path = PurePosixPath(name)
+    return str(
+        path.parent / ContentAddressedStorage.derived_directory / f"{path.name}.{variant}.{fmt}"
+    )
+
+
+def original_path(name: str) -> str:
+    """
+    Name of the image a variant was rendered from, ``name`` for originals
+    """
+    path = PurePosixPath(name)
+    if path.parent.name != ContentAddressedStorage.derived_directory:
+        return name
+    return str(path.parent.parent / path.name.rsplit(".", 2)[0])
+
+
+def generate_variants(
+    model: type[models.Model],
+    pk: Any,
+    field_name: str,
+    using: str = DEFAULT_DB_ALIAS,
+    in_process=False,
+):
+    """
+    Render and store the variants of an image field, then record them if the
+    field still holds the same file.
+    """
+    objects = model._default_manager.using(using)
+    instance = objects.filter(pk=pk).only(field_name).first()
+    file = getattr(instance, field_name, None)
+    if not file:
+        return
+
+    formats = available_formats()
+    variants = {
+        variant: {fmt: variant_path(file.name, variant, fmt) for fmt in formats}
+        for variant in VARIANTS
+    }
+
+    # Identical uploads share a content-addressed name, and so their variants
+    if not all(file.storage.exists(name) for names in variants.values() for name in names.values()):
+        try:
+            source: str | bytes = file.path
+        except NotImplementedError:
+            with file.open("rb") as f:
+                source = f.read()
+
+        if in_process:
+            rendered = render_variants(source, formats)
+        else:
+            rendered = tasks.get_process_pool().submit(render_variants, source, formats).result()
+
+        for variant, encoded in rendered.items():
+            for fmt, content in encoded.items():
+                variants[variant][fmt] = file.storage.save(
+                    variants[variant][fmt], ContentFile(content)
+                )
+
+    # Left alone when the file was replaced while rendering, the new file has
+    # its own task. sweep_media removes these variants.
+    objects.filter(pk=pk, **{field_name: file.name}).update(**{f"{field_name}_variants": variants})
+
+
+def schedule_variants(instance: models.Model, field_name: str, using: str):
+    tasks.on_commit(generate_variants, type(instance), instance.pk, field_name, using, using=using)
+
+
+def variant_name(variants: dict[str, dict[str, str]], variant: str) -> str | None:
+    """
+    Stored name of ``variant`` in WebP, which every supported browser decodes.
+    Clients wanting AVIF read the whole map for <picture> sources.
+    """
+    return variants.get(variant, {}).get("webp")
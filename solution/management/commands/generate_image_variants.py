@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from solution import images
+
+
+class Command(BaseCommand):
+    help = "Render the resized variants of account photos and logos that have none yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Also images that already have variants, rendering any missing file",
+        )
+
+    def handle(self, *args, all, **options):
+        for label, field_names in images.IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            for field_name in field_names:
+                queryset = model.objects.exclude(**{field_name: ""}).exclude(
+                    **{f"{field_name}__isnull": True}
+                )
+                if not all:
+                    queryset = queryset.filter(**{f"{field_name}_variants": {}})
+                pks = list(queryset.values_list("pk", flat=True))
+
+                def generate(pk, model=model, field_name=field_name):
+                    try:
+                        images.generate_variants(model, pk, field_name)
+                    finally:
+                        connection.close()
+
+                # Threads only wait on the process pool, which does the rendering
+                with ThreadPoolExecutor(max_workers=settings.BACKGROUND_PROCESSES) as executor:
+                    list(executor.map(generate, pks))
+
+                self.stdout.write(f"Rendered {len(pks)} {model._meta.verbose_name} {field_name}")
+
+        self.stdout.write(self.style.SUCCESS("Image variants rendered"))
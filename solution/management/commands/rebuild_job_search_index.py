@@ -0,0 +1,62 @@
+import contextlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from solution import search
+from solution.models import Job
+from solution.utils import chunked
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of jobs in parallel chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Chunks loaded and indexed concurrently. Writes are serialized on SQLite.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, chunk_size, workers, database, **options):
+        ids = list(Job.objects.using(database).order_by("pk").values_list("pk", flat=True))
+        chunks = list(chunked(ids, chunk_size))
+
+        # SQLite allows a single writer, concurrent write transactions fail instead of waiting
+        if connections[database].vendor == "sqlite":
+            write_lock = threading.Lock()
+        else:
+            write_lock = contextlib.nullcontext()
+
+        def index_chunk(chunk):
+            try:
+                rows = list(
+                    Job.objects.using(database)
+                    .filter(pk__in=chunk)
+                    .values_list("pk", *search.SEARCH_FIELDS)
+                )
+                with write_lock, transaction.atomic(using=database):
+                    search.index_rows(rows, using=database)
+                return len(rows)
+            finally:
+                if workers > 1:
+                    connections[database].close()
+
+        indexed = 0
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for count in executor.map(index_chunk, chunks):
+                    indexed += count
+                    self.stdout.write(f"Indexed {indexed}/{len(ids)} jobs")
+        else:
+            for chunk in chunks:
+                indexed += index_chunk(chunk)
+                self.stdout.write(f"Indexed {indexed}/{len(ids)} jobs")
+
+        search.prune(using=database)
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt with {indexed} jobs"))
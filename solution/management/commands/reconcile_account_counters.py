@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from solution import aggregates
+from solution.models import EmployerAccount, WorkerAccount
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized account counters and ratings from the source tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Accounts updated per statement, bounds how long rows stay locked",
+        )
+
+    def handle(self, *args, chunk_size, **options):
+        for model, reconcile in (
+            (WorkerAccount, aggregates.reconcile_worker_counters),
+            (EmployerAccount, aggregates.reconcile_employer_counters),
+        ):
+            name = model._meta.verbose_name_plural
+            updated = 0
+            last_pk = None
+
+            while True:
+                queryset = model.objects.order_by("pk")
+                if last_pk is not None:
+                    queryset = queryset.filter(pk__gt=last_pk)
+
+                pks = list(queryset.values_list("pk", flat=True)[:chunk_size])
+                if not pks:
+                    break
+
+                updated += reconcile(model.objects.filter(pk__in=pks))
+                last_pk = pks[-1]
+                self.stdout.write(f"Reconciled {updated} {name}")
+
+            self.stdout.write(self.style.SUCCESS(f"Reconciled {updated} {name}"))
@@ -0,0 +1,58 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from solution import images, media
+from solution.models import OrphanedFile
+from solution.storage import content_storage
+from solution.utils import app_name
+
+
+class Command(BaseCommand):
+    help = "Delete stored media files that no row references"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=float,
+            default=24,
+            help="Hours since a file was written before it may be deleted. "
+            "Protects uploads whose transaction has not committed yet.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def walk(self, path: str):
+        directories, files = content_storage.listdir(path)
+        for file in files:
+            yield f"{path}/{file}"
+        for directory in directories:
+            yield from self.walk(f"{path}/{directory}")
+
+    def handle(self, *args, min_age, dry_run, **options):
+        if not content_storage.exists(app_name):
+            self.stdout.write(self.style.SUCCESS("No media files"))
+            return
+
+        cutoff = timezone.now() - datetime.timedelta(hours=min_age)
+        referenced = media.referenced_originals()
+        pending = set(OrphanedFile.objects.values_list("name", flat=True))
+
+        orphans = [
+            name
+            for name in self.walk(app_name)
+            if images.original_path(name) not in referenced
+            and name not in pending
+            and content_storage.get_modified_time(name) < cutoff
+        ]
+
+        for name in orphans:
+            self.stdout.write(name, style_func=self.style.NOTICE)
+
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS(f"Found {len(orphans)} orphaned files"))
+            return
+
+        OrphanedFile.objects.bulk_create([OrphanedFile(name=name) for name in orphans])
+        deleted = media.delete_orphans(grace_period=min_age * 60 * 60)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} orphaned files"))
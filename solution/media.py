@@ -0,0 +1,166 @@
+"""
+Deferred deletion of media files.
+
+Files replaced or left behind by a save are recorded as OrphanedFile rows in
+the same transaction, so they are only recorded if it commits. A background
+task then deletes them from storage in batches. sweep_media finds files that
+no row references, like uploads of transactions that rolled back.
+
+Identical uploads share one file, and a new owner's row only becomes visible
+once its transaction commits. Files written or reused within
+MEDIA_ORPHAN_GRACE_PERIOD are therefore kept, their OrphanedFile rows stay
+for a later pass.
+"""
+
+import contextlib
+import datetime
+import threading
+from typing import Iterable
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, models
+from django.utils import timezone
+
+from solution import images, tasks
+from solution.models import OrphanedFile
+from solution.storage import content_storage
+
+BATCH_SIZE = 500
+
+
+def file_names(instance: models.Model, field_names: Iterable[str] | None = None) -> list[str]:
+    """
+    Stored names of the image fields of ``instance`` and of their variants
+    """
+    if field_names is None:
+        field_names = images.IMAGE_FIELDS[instance._meta.label]
+
+    names = []
+    for field_name in field_names:
+        name = getattr(instance, field_name)
+        if name:
+            names.append(str(name))
+        for formats in (getattr(instance, f"{field_name}_variants") or {}).values():
+            names.extend(formats.values())
+
+    return names
+
+
+def referenced_originals(
+    names: Iterable[str] | None = None, using: str = DEFAULT_DB_ALIAS
+) -> set[str]:
+    """
+    Image names referenced by a row, out of ``names`` or all of them
+    """
+    if names is not None:
+        names = set(names)
+        if not names:
+            return set()
+
+    referenced = set()
+    for label, field_names in images.IMAGE_FIELDS.items():
+        manager = apps.get_model(label)._default_manager.using(using)
+        for field_name in field_names:
+            queryset = manager.exclude(**{field_name: ""})
+            if names is not None:
+                queryset = queryset.filter(**{f"{field_name}__in": names})
+            referenced.update(queryset.values_list(field_name, flat=True))
+
+    return referenced
+
+
+def unreferenced(names: Iterable[str], using: str = DEFAULT_DB_ALIAS) -> list[str]:
+    """
+    The names out of ``names`` no row references. Files are shared between rows
+    with the same content, a file is only unreferenced once no row holds it.
+    Variants belong to the image they were rendered from.
+    """
+    names = list(names)
+    referenced = referenced_originals({images.original_path(name) for name in names}, using)
+    return [name for name in names if images.original_path(name) not in referenced]
+
+
+# Names gathered by collecting() on this thread, per database
+batches = threading.local()
+
+
+def collect(names: Iterable[str], using: str = DEFAULT_DB_ALIAS):
+    """
+    Delete files once the current transaction commits
+    """
+    pending = getattr(batches, "names", None)
+    if pending is not None:
+        pending.setdefault(using, set()).update(name for name in names if name)
+        return
+
+    orphans = [OrphanedFile(name=name) for name in set(names) if name]
+    if not orphans:
+        return
+
+    OrphanedFile.objects.using(using).bulk_create(orphans)
+    tasks.on_commit(delete_orphans, using, using=using)
+
+
+@contextlib.contextmanager
+def collecting():
+    """
+    Gather the files collected within, e.g. by the delete signals of a bulk
+    delete, into one insert and one deletion task per database on exit. Exit
+    inside the transaction doing the changes.
+    """
+    if getattr(batches, "names", None) is not None:
+        # Nested, the outer block collects
+        yield
+        return
+
+    batches.names = {}
+    try:
+        yield
+        pending = batches.names
+    finally:
+        batches.names = None
+
+    for using, names in pending.items():
+        collect(names, using)
+
+
+def written_since(name: str, cutoff: datetime.datetime) -> bool:
+    try:
+        return content_storage.get_modified_time(images.original_path(name)) >= cutoff
+    except FileNotFoundError:
+        return False
+
+
+def delete_orphans(
+    using: str = DEFAULT_DB_ALIAS,
+    batch_size: int = BATCH_SIZE,
+    grace_period: float | None = None,
+) -> int:
+    """
+    Delete the unreferenced files of OrphanedFile rows not written within
+    ``grace_period`` seconds, MEDIA_ORPHAN_GRACE_PERIOD by default
+    """
+    if grace_period is None:
+        grace_period = settings.MEDIA_ORPHAN_GRACE_PERIOD
+    cutoff = timezone.now() - datetime.timedelta(seconds=grace_period)
+
+    orphans = OrphanedFile.objects.using(using).order_by("pk")
+    deleted = 0
+    last_pk = 0
+    while True:
+        batch = list(orphans.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return deleted
+        last_pk = batch[-1].pk
+
+        # Another row may hold the same file, or hold it again
+        kept = set()
+        for name in unreferenced((orphan.name for orphan in batch), using):
+            if written_since(name, cutoff):
+                kept.add(name)
+                continue
+            content_storage.delete(name)
+            deleted += 1
+
+        orphans.filter(pk__in=[orphan.pk for orphan in batch if orphan.name not in kept]).delete()
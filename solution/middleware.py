@@ -0,0 +1,29 @@
+"""
+Static files middleware.
+"""
+
+from functools import cached_property
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from whitenoise import middleware
+
+from solution.storage import VITE_MANIFEST_NAME, read_vite_files
+
+
+class WhiteNoiseMiddleware(middleware.WhiteNoiseMiddleware):
+    """
+    WhiteNoise, also serving the files listed in the collected Vite manifest
+    with "Cache-Control: immutable". Those keep the names "vite build" gave
+    them, see solution.storage.ViteManifestStaticFilesStorage, so WhiteNoise's
+    own check for names hashed by Django passes over them.
+    """
+
+    @cached_property
+    def vite_urls(self) -> frozenset[str]:
+        return frozenset(
+            self.static_prefix + name
+            for name in read_vite_files(staticfiles_storage, VITE_MANIFEST_NAME)
+        )
+
+    def immutable_file_test(self, path, url):
+        return url in self.vite_urls or super().immutable_file_test(path, url)
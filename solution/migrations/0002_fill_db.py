@@ -1,10 +1,9 @@
 # Generated by Django 4.2.2 on 2023-06-18 19:42
 
-import json
-
-from django.conf import settings
 from django.db import migrations
 
+from solution import static_data
+
 
 def fill_db(apps, schema_editor):
     # We can't import the Person model directly as it may be a newer
@@ -16,21 +15,18 @@ def fill_db(apps, schema_editor):
     DaysSchedule = apps.get_model("solution", "DaysSchedule")
     JobTag = apps.get_model("solution", "JobTag")
 
-    with open(settings.BASE_DIR / "solution/frontend/static-data/db.json") as db:
-        db_json = json.loads(db.read())
-        profession_objs = [Profession(name=role) for role in db_json["roles"]]
-        job_types = [JobType(name=job_type) for job_type in db_json["jobTypes"]]
-        shifts = [Shift(name=shift) for shift in db_json["shifts"]]
-        days_schedules = [
-            DaysSchedule(name=days_schedule) for days_schedule in db_json["daysSchedule"]
-        ]
-        job_tags = [JobTag(name=job_tag) for job_tag in db_json["jobTags"]]
-
-        Profession.objects.bulk_create(profession_objs)
-        JobType.objects.bulk_create(job_types)
-        Shift.objects.bulk_create(shifts)
-        DaysSchedule.objects.bulk_create(days_schedules)
-        JobTag.objects.bulk_create(job_tags)
+    db_json = static_data.seed_data()
+    profession_objs = [Profession(name=role) for role in db_json["roles"]]
+    job_types = [JobType(name=job_type) for job_type in db_json["jobTypes"]]
+    shifts = [Shift(name=shift) for shift in db_json["shifts"]]
+    days_schedules = [DaysSchedule(name=days_schedule) for days_schedule in db_json["daysSchedule"]]
+    job_tags = [JobTag(name=job_tag) for job_tag in db_json["jobTags"]]
+
+    Profession.objects.bulk_create(profession_objs)
+    JobType.objects.bulk_create(job_types)
+    Shift.objects.bulk_create(shifts)
+    DaysSchedule.objects.bulk_create(days_schedules)
+    JobTag.objects.bulk_create(job_tags)
 
     User.objects.create_superuser(username="fernando", email="fernando@me.com", password="123")  # type: ignore
 
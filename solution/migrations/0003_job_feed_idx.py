@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [("solution", "0002_fill_db")]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("done", False)),
+                fields=["-posted_date", "-id"],
+                name="job_feed_idx",
+            ),
+        )
+    ]
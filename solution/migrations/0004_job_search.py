@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from solution import search
+from solution.utils import chunked
+
+
+def create_search_index(apps, schema_editor):
+    Job = apps.get_model("solution", "Job")
+    backend = search.get_backend(schema_editor.connection.alias)
+
+    with schema_editor.connection.cursor() as cursor:
+        backend.create(cursor)
+        rows = list(Job.objects.values_list("id", *search.SEARCH_FIELDS))
+        for chunk in chunked(rows, 1000):
+            backend.index(cursor, chunk)
+
+
+def drop_search_index(apps, schema_editor):
+    backend = search.get_backend(schema_editor.connection.alias)
+
+    with schema_editor.connection.cursor() as cursor:
+        backend.drop(cursor)
+
+
+class Migration(migrations.Migration):
+    dependencies = [("solution", "0003_job_feed_idx")]
+
+    operations = [migrations.RunPython(create_search_index, drop_search_index)]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [("solution", "0004_job_search")]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="workeraccount",
+            index=models.Index(
+                fields=["profession", "rating", "verified_id", "driving_license"],
+                name="worker_search_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workeraccount",
+            index=models.Index(fields=["-rating", "user"], name="worker_rating_idx"),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.0 on 2026-10-18 18:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    WorkerAccount = apps.get_model("solution", "WorkerAccount")
+    EmployerFeedback = apps.get_model("solution", "EmployerFeedback")
+    Job = apps.get_model("solution", "Job")
+
+    reviews = (
+        EmployerFeedback.objects.filter(worker=OuterRef("pk"))
+        .order_by()
+        .values("worker")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    jobs_done = (
+        Job.workers.through.objects.filter(workeraccount=OuterRef("pk"), job__done=True)
+        .order_by()
+        .values("workeraccount")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    WorkerAccount.objects.update(
+        review_count=Coalesce(Subquery(reviews), 0), jobs_done=Coalesce(Subquery(jobs_done), 0)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [("solution", "0005_worker_search_idx")]
+
+    operations = [
+        migrations.AddField(
+            model_name="workeraccount",
+            name="review_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="workeraccount",
+            name="jobs_done",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.0 on 2026-10-18 18:41
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import Count, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, Greatest
+
+
+def fill_ratings(apps, schema_editor):
+    for account, feedback, field in (
+        ("WorkerAccount", "EmployerFeedback", "worker"),
+        ("EmployerAccount", "WorkerFeedback", "employer"),
+    ):
+        Account = apps.get_model("solution", account)
+        Feedback = apps.get_model("solution", feedback)
+
+        feedbacks = Feedback.objects.filter(**{field: OuterRef("pk")}).order_by().values(field)
+        rating_sum = Coalesce(Subquery(feedbacks.annotate(total=Sum("rating")).values("total")), 0)
+        review_count = Coalesce(Subquery(feedbacks.annotate(count=Count("pk")).values("count")), 0)
+        Account.objects.update(
+            rating_sum=rating_sum,
+            review_count=review_count,
+            rating=Cast(rating_sum, FloatField()) / Greatest(review_count, 1),
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [("solution", "0006_worker_counters")]
+
+    operations = [
+        migrations.AddField(
+            model_name="employeraccount",
+            name="rating",
+            field=models.FloatField(
+                default=0,
+                validators=[
+                    django.core.validators.MinValueValidator(0),
+                    django.core.validators.MaxValueValidator(5),
+                ],
+            ),
+        ),
+        migrations.AddField(
+            model_name="employeraccount",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="employeraccount",
+            name="review_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="workeraccount",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name="workeraccount",
+            name="rating",
+            field=models.FloatField(
+                default=0,
+                validators=[
+                    django.core.validators.MinValueValidator(0),
+                    django.core.validators.MaxValueValidator(5),
+                ],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="employeraccount",
+            index=models.Index(fields=["-rating", "user"], name="employer_rating_idx"),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
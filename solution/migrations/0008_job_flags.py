@@ -0,0 +1,46 @@
+# Generated by Django 5.0 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+from solution import validators
+from solution.utils import to_bitmask
+
+FLAG_CHOICES = {
+    "types": validators.JOB_TYPES,
+    "shifts": validators.SHIFTS,
+    "tags": validators.TAGS,
+}
+
+
+def fill_flags(apps, schema_editor):
+    Job = apps.get_model("solution", "Job")
+
+    jobs = list(Job.objects.only(*FLAG_CHOICES))
+    for job in jobs:
+        for field, choices in FLAG_CHOICES.items():
+            setattr(job, f"{field}_mask", to_bitmask(getattr(job, field), choices))
+
+    Job.objects.bulk_update(jobs, [f"{field}_mask" for field in FLAG_CHOICES], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [("solution", "0007_account_ratings")]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="shifts_mask",
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="tags_mask",
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="types_mask",
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(fill_flags, migrations.RunPython.noop),
+    ]
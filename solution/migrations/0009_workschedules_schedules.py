@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-18 19:24
+
+from django.db import migrations, models
+
+import solution.validators
+
+
+class Migration(migrations.Migration):
+    dependencies = [("solution", "0008_job_flags")]
+
+    operations = [
+        migrations.AddField(
+            model_name="workschedules",
+            name="schedules",
+            field=models.JSONField(
+                default=list, validators=[solution.validators.validate_schedule]
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="workschedules",
+            name="schedules_mask",
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-18 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [("solution", "0009_workschedules_schedules")]
+
+    operations = [
+        migrations.AddField(
+            model_name="workeraccount",
+            name="photo_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="employeraccount",
+            name="logo_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="employeraccount",
+            name="personal_photo_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
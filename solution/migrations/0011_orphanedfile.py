@@ -0,0 +1,24 @@
+# Generated by Django 5.0 on 2026-10-18 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [("solution", "0010_image_variants")]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrphanedFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={"abstract": False},
+        ),
+    ]
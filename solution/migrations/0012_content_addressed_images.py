@@ -0,0 +1,62 @@
+# Generated by Django 5.0 on 2026-10-18 22:01
+
+from django.db import migrations, models
+
+import solution.storage
+import solution.utils
+import solution.validators
+
+
+class Migration(migrations.Migration):
+    dependencies = [("solution", "0011_orphanedfile")]
+
+    operations = [
+        migrations.AlterField(
+            model_name="employeraccount",
+            name="logo",
+            field=models.ImageField(
+                blank=True,
+                db_index=True,
+                max_length=255,
+                storage=solution.storage.ContentAddressedStorage(),
+                upload_to=solution.utils.employer_logo_path,
+                validators=[
+                    solution.validators.FileValidator(
+                        content_types=("image/jpeg", "image/png"), max_size=3
+                    )
+                ],
+            ),
+        ),
+        migrations.AlterField(
+            model_name="employeraccount",
+            name="personal_photo",
+            field=models.ImageField(
+                blank=True,
+                db_index=True,
+                max_length=255,
+                storage=solution.storage.ContentAddressedStorage(),
+                upload_to=solution.utils.employer_photo_path,
+                validators=[
+                    solution.validators.FileValidator(
+                        content_types=("image/jpeg", "image/png"), max_size=3
+                    )
+                ],
+            ),
+        ),
+        migrations.AlterField(
+            model_name="workeraccount",
+            name="photo",
+            field=models.ImageField(
+                blank=True,
+                db_index=True,
+                max_length=255,
+                storage=solution.storage.ContentAddressedStorage(),
+                upload_to=solution.utils.worker_account_path,
+                validators=[
+                    solution.validators.FileValidator(
+                        content_types=("image/jpeg", "image/png"), max_size=3
+                    )
+                ],
+            ),
+        ),
+    ]
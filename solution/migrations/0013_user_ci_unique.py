@@ -0,0 +1,58 @@
+# Generated by Django 5.0 on 2026-10-18 22:34
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicates(apps, schema_editor):
+    """
+    Emails were never unique and usernames were unique with their case, rows
+    differing only in case would fail the constraints halfway. Which account
+    keeps the name is for an admin to decide, so list them instead.
+    """
+    User = apps.get_model("solution", "User")
+    users = User.objects.using(schema_editor.connection.alias)
+
+    conflicts = []
+    for field, queryset in (("email", users.exclude(email="")), ("username", users)):
+        duplicates = (
+            queryset.annotate(key=Lower(field))
+            .values("key")
+            .annotate(count=Count("pk"))
+            .filter(count__gt=1)
+            .values_list("key", flat=True)
+        )
+        for key in duplicates:
+            pks = users.annotate(key=Lower(field)).filter(key=key).values_list("pk", flat=True)
+            conflicts.append(f"{field} {key!r}: users {', '.join(map(str, sorted(pks)))}")
+
+    if conflicts:
+        raise RuntimeError(
+            "Users differing only in the case of their email or username, change or "
+            "clear all but one of each before migrating:\n" + "\n".join(conflicts)
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [("solution", "0012_content_addressed_images")]
+
+    operations = [
+        migrations.RunPython(check_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                condition=models.Q(("email", ""), _negated=True),
+                name="user_email_ci_unique",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("username"),
+                name="user_username_ci_unique",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [("solution", "0013_user_ci_unique")]
+
+    operations = [
+        migrations.CreateModel(
+            name="RevokedToken",
+            fields=[
+                ("key", models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ("issued_before", models.BigIntegerField()),
+                ("expires", models.DateTimeField(db_index=True)),
+            ],
+            options={"abstract": False},
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-18 23:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [("solution", "0014_revokedtoken")]
+
+    operations = [
+        migrations.AlterField(
+            model_name="job",
+            name="shifts_mask",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="tags_mask",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="types_mask",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="workschedules",
+            name="schedules_mask",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,20 +1,30 @@
 from __future__ import annotations
 
+import enum
 import uuid
+from collections import defaultdict
 from datetime import date
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Iterable
 
-import orjson
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core import validators
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models
-from django.forms import JSONField
+from django.db import models, transaction
+from django.db.models.functions import Lower
+from django.db.models.lookups import GreaterThan
 from django.utils.translation import gettext_lazy as _
 
+from solution import static_data
 from solution import validators as app_validators
-from solution.utils import employer_logo_path, employer_photo_path, worker_account_path
+from solution.storage import content_storage
+from solution.utils import (
+    employer_logo_path,
+    employer_photo_path,
+    to_bitmask,
+    worker_account_path,
+)
 
 file_validator = app_validators.FileValidator(max_size=3, content_types=("image/jpeg", "image/png"))
 
@@ -23,11 +33,20 @@ if TYPE_CHECKING:
 
 
 def get_company_size():
-    with open(settings.BASE_DIR / "solution/frontend/static-data/companySizes.json") as f:
-        return orjson.loads(f.read())
+    return static_data.company_sizes()
 
 
 class User(AbstractUser):
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Case-insensitive, registration relies on them instead of checking first,
+            # see RegisterForm.save. Users created without an email may share the blank one.
+            models.UniqueConstraint(
+                Lower("email"), condition=~models.Q(email=""), name="user_email_ci_unique"
+            ),
+            models.UniqueConstraint(Lower("username"), name="user_username_ci_unique"),
+        ]
+
     id: int
 
     worker_account: Manager[WorkerAccount]
@@ -52,13 +71,184 @@ class User(AbstractUser):
     has_employer_account = models.BooleanField(default=False)
 
 
+class SaveMode(enum.Enum):
+    """
+    How much of full_clean() BaseModel.save runs before writing
+    """
+
+    # Field validators, clean(), and the unique and constraint checks, which
+    # cost a SELECT each. For user input.
+    FULL = "full"
+    # Field validators and clean() only, without the unique, constraint and
+    # foreign key existence probes. The database still enforces those, a
+    # violation raises IntegrityError instead of ValidationError.
+    FIELDS = "fields"
+    # No validation, for internal writes of values that are already valid
+    TRUSTED = "trusted"
+
+
 class BaseModel(models.Model):
     class Meta:
         abstract = True
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
+    # Field values as last read from or written to the database, keyed by attname.
+    # Lets signal handlers see what changed without querying the old row.
+    _loaded_values: dict[str, Any]
+
+    # Columns maintained with queryset updates by signal handlers and background
+    # tasks. Saves of existing rows leave them out, so a stale instance can't
+    # overwrite them.
+    managed_fields: tuple[str, ...] = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, mode: SaveMode = SaveMode.FULL, **kwargs):
+        if (
+            self.managed_fields
+            and not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.managed_fields
+            ]
+
+        if mode is not SaveMode.TRUSTED:
+            exclude = set()
+            if kwargs.get("update_fields") is not None:
+                # Only validate the fields being written
+                update_fields = set(kwargs["update_fields"])
+                exclude = {
+                    field.name
+                    for field in self._meta.concrete_fields
+                    if field.name not in update_fields and field.attname not in update_fields
+                }
+
+            full = mode is SaveMode.FULL
+            if not full:
+                exclude |= self.foreign_key_names()
+            self.full_clean(exclude=exclude, validate_unique=full, validate_constraints=full)
+
         super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields
+        }
+
+    @classmethod
+    def validate_batch(
+        cls, objs: Iterable[BaseModel], mode: SaveMode = SaveMode.FULL
+    ) -> dict[int, ValidationError]:
+        """
+        Validate objects before a bulk_create. Returns the errors of invalid
+        objects keyed by position in ``objs``, empty if all are valid.
+
+        Fields are validated per object in memory. Unique fields and unique
+        constraints over plain fields are checked within the batch in memory.
+        With SaveMode.FULL they and the foreign keys are also checked against
+        the database, with one query per constraint or foreign key instead of
+        one per object.
+        """
+        objs = list(objs)
+        if mode is SaveMode.TRUSTED or not objs:
+            return {}
+
+        foreign_keys = cls.foreign_key_names()
+        errors: dict[int, dict[str, list]] = defaultdict(dict)
+        for i, obj in enumerate(objs):
+            try:
+                obj.full_clean(
+                    exclude=foreign_keys, validate_unique=False, validate_constraints=False
+                )
+            except ValidationError as e:
+                e.update_error_dict(errors[i])
+
+        if mode is SaveMode.FULL:
+            for name in foreign_keys:
+                field = cls._meta.get_field(name)
+                target = field.target_field.attname
+                values = {getattr(obj, field.attname) for obj in objs} - {None}
+                existing = set(
+                    field.remote_field.model._base_manager.filter(
+                        **{f"{target}__in": values}
+                    ).values_list(target, flat=True)
+                )
+                for i, obj in enumerate(objs):
+                    value = getattr(obj, field.attname)
+                    if value is not None and value not in existing:
+                        error = ValidationError(
+                            field.error_messages["invalid"],
+                            code="invalid",
+                            params={
+                                "model": field.remote_field.model._meta.verbose_name,
+                                "pk": value,
+                                "field": field.remote_field.field_name,
+                                "value": value,
+                            },
+                        )
+                        errors[i].setdefault(name, []).append(error)
+
+        for fields in cls.batch_unique_checks():
+            attnames = [cls._meta.get_field(name).attname for name in fields]
+            error_key = fields[0] if len(fields) == 1 else NON_FIELD_ERRORS
+            seen: dict[tuple, int] = {}
+            duplicates: list[int] = []
+            for i, obj in enumerate(objs):
+                key = tuple(getattr(obj, attname) for attname in attnames)
+                if None in key:
+                    continue
+                if key in seen:
+                    duplicates.append(i)
+                else:
+                    seen[key] = i
+
+            if mode is SaveMode.FULL and seen:
+                lookup = models.Q()
+                for key in seen:
+                    lookup |= models.Q(**dict(zip(attnames, key)))
+                existing = cls._default_manager.filter(lookup).values_list(*attnames)
+                duplicates.extend(seen[key] for key in existing if key in seen)
+
+            for i in duplicates:
+                error = objs[i].unique_error_message(cls, fields)
+                errors[i].setdefault(error_key, []).append(error)
+
+        return {i: ValidationError(errors[i]) for i in sorted(errors)}
+
+    @classmethod
+    def foreign_key_names(cls) -> set[str]:
+        return {
+            field.name
+            for field in cls._meta.concrete_fields
+            if field.many_to_one or field.one_to_one
+        }
+
+    @classmethod
+    def batch_unique_checks(cls):
+        """
+        Yield the field names of unique fields and of unconditional
+        UniqueConstraints over plain fields. The primary key is left out when
+        the database or a default generates it.
+        """
+        for field in cls._meta.concrete_fields:
+            generated = isinstance(field, models.AutoField) or field.has_default()
+            if field.unique and not (field.primary_key and generated):
+                yield (field.name,)
+
+        for constraint in cls._meta.total_unique_constraints:
+            if constraint.fields:
+                yield tuple(constraint.fields)
+
+    def loaded_value(self, attname: str, default=None):
+        """
+        Value of ``attname`` before the current changes, ``default`` for unsaved objects
+        """
+        return getattr(self, "_loaded_values", {}).get(attname, default)
 
     def __str__(self) -> str:
         return self.__repr__()
@@ -112,6 +302,17 @@ class JobTag(BaseModel):
 
 
 class WorkerAccount(BaseModel):
+    class Meta:
+        indexes = [
+            # Worker search filters, see WorkerSearchView
+            models.Index(
+                fields=["profession", "rating", "verified_id", "driving_license"],
+                name="worker_search_idx",
+            ),
+            # Unfiltered worker search, matches WorkerSearchPagination
+            models.Index(fields=["-rating", "user"], name="worker_rating_idx"),
+        ]
+
     applied_jobs: Manager[Job]
     jobs: Manager[Job]
     received_feedbacks: Manager[EmployerFeedback]
@@ -126,8 +327,15 @@ class WorkerAccount(BaseModel):
         primary_key=True,
     )
     photo = models.ImageField(
-        blank=True, upload_to=worker_account_path, validators=[file_validator]
+        blank=True,
+        upload_to=worker_account_path,
+        storage=content_storage,
+        validators=[file_validator],
+        max_length=255,
+        db_index=True,
     )
+    # Resized copies of photo, see solution.images
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False)
     profession_id: int
     profession = models.ForeignKey(
         to=Profession, on_delete=models.CASCADE, related_name="professionals"
@@ -138,28 +346,31 @@ class WorkerAccount(BaseModel):
     phone = models.CharField(
         max_length=20, validators=[validators.RegexValidator(r"^(\d{1,3})(\d{2})(\d{9})$")]
     )
-    rating = models.IntegerField(
+    # Average of received_feedbacks, kept up to date by solution.signals
+    rating = models.FloatField(
         default=0, validators=[validators.MinValueValidator(0), validators.MaxValueValidator(5)]
     )
+    rating_sum = models.PositiveIntegerField(default=0)
     location = models.CharField(max_length=50)
     about = models.CharField(blank=True, max_length=255)
     verified_id = models.BooleanField(default=False)
     driving_license = models.BooleanField(default=False)
+    # Kept up to date by solution.signals, see reconcile_account_counters.
+    # Also the number of ratings averaged in rating.
+    review_count = models.PositiveIntegerField(default=0)
+    jobs_done = models.PositiveIntegerField(default=0)
     last_update = models.DateTimeField(auto_now=True)
 
-    @property
-    def review_count(self) -> int:
-        return self.received_feedbacks.count()
-
-    @property
-    def jobs_done(self) -> int:
-        return self.jobs.filter(done=True).count()
+    managed_fields = ("rating", "rating_sum", "review_count", "jobs_done", "photo_variants")
 
     def __repr__(self) -> str:
         return f"{self.user_id} - {self.profession}"
 
 
 class EmployerAccount(BaseModel):
+    class Meta:
+        indexes = [models.Index(fields=["-rating", "user"], name="employer_rating_idx")]
+
     worker_feedbacks: Manager[EmployerFeedback]
     received_feedbacks: Manager[WorkerFeedback]
     contracts: Manager[Contract]
@@ -172,7 +383,15 @@ class EmployerAccount(BaseModel):
         primary_key=True,
     )
     # Company Data
-    logo = models.ImageField(blank=True, upload_to=employer_logo_path, validators=[file_validator])
+    logo = models.ImageField(
+        blank=True,
+        upload_to=employer_logo_path,
+        storage=content_storage,
+        validators=[file_validator],
+        max_length=255,
+        db_index=True,
+    )
+    logo_variants = models.JSONField(default=dict, blank=True, editable=False)
     company_name = models.CharField(max_length=50)
     address = models.CharField(max_length=255)
     legal_name = models.CharField(max_length=100)
@@ -185,8 +404,14 @@ class EmployerAccount(BaseModel):
 
     # Personal Data
     personal_photo = models.ImageField(
-        blank=True, upload_to=employer_photo_path, validators=[file_validator]
+        blank=True,
+        upload_to=employer_photo_path,
+        storage=content_storage,
+        validators=[file_validator],
+        max_length=255,
+        db_index=True,
     )
+    personal_photo_variants = models.JSONField(default=dict, blank=True, editable=False)
     role = models.CharField(max_length=50)
     first_name = models.CharField(max_length=50)
     last_name = models.CharField(max_length=50)
@@ -194,13 +419,66 @@ class EmployerAccount(BaseModel):
         max_length=20, validators=[validators.RegexValidator(r"^(\d{1,3})(\d{2})(\d{9})$")]
     )
     verified_id = models.BooleanField(default=False)
+    # Average of received_feedbacks, kept up to date by solution.signals
+    rating = models.FloatField(
+        default=0, validators=[validators.MinValueValidator(0), validators.MaxValueValidator(5)]
+    )
+    rating_sum = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
     last_update = models.DateTimeField(auto_now=True)
 
+    managed_fields = (
+        "rating",
+        "rating_sum",
+        "review_count",
+        "logo_variants",
+        "personal_photo_variants",
+    )
+
     def __repr__(self) -> str:
         return f"{self.user_id} - {self.company_name} - {self.role}"
 
 
+class JobQuerySet(models.QuerySet):
+    def with_flags(self, types=(), shifts=(), tags=(), schedules=()) -> JobQuerySet:
+        """
+        Jobs having any of the given values in every non-empty group,
+        e.g. ``with_flags(types=["Full-Time"], shifts=["Night Shift"])``
+
+        No index serves ``mask & x > 0``, the rows left by the other filters are
+        scanned with an integer test each instead of a JSON lookup.
+        """
+        queryset = self
+        for field, values in (("types", types), ("shifts", shifts), ("tags", tags)):
+            if values:
+                mask = to_bitmask(values, Job.FLAG_CHOICES[field])
+                queryset = queryset.filter(GreaterThan(models.F(f"{field}_mask").bitand(mask), 0))
+
+        if schedules:
+            mask = to_bitmask(schedules, app_validators.SCHEDULE)
+            queryset = queryset.filter(
+                models.Exists(
+                    WorkSchedules.objects.filter(
+                        GreaterThan(models.F("schedules_mask").bitand(mask), 0),
+                        job=models.OuterRef("pk"),
+                    )
+                )
+            )
+
+        return queryset
+
+
 class Job(BaseModel):
+    class Meta:
+        indexes = [
+            # Matches the keyset ordering of the job feed, see JobFeedPagination
+            models.Index(
+                fields=["-posted_date", "-id"],
+                condition=models.Q(done=False),
+                name="job_feed_idx",
+            )
+        ]
+
     work_schedules: Manager[WorkSchedules]
     employer_feedbacks: Manager[EmployerFeedback]
     worker_feedbacks: Manager[WorkerFeedback]
@@ -228,11 +506,35 @@ class Job(BaseModel):
     period_salary = models.CharField(max_length=255)
     application_instructions = models.TextField()
     tags = models.JSONField(validators=[app_validators.validate_tags])
+    # Bitmasks of types, shifts and tags over FLAG_CHOICES, see sync_flags
+    types_mask = models.PositiveIntegerField(default=0, editable=False)
+    shifts_mask = models.PositiveIntegerField(default=0, editable=False)
+    tags_mask = models.PositiveIntegerField(default=0, editable=False)
     applicants = models.ManyToManyField(to=WorkerAccount, related_name="applied_jobs")
     workers = models.ManyToManyField(to=WorkerAccount, related_name="jobs")
     done = models.BooleanField(default=False)
     posted_date = models.DateTimeField(auto_now_add=True)
 
+    FLAG_CHOICES = {
+        "types": app_validators.JOB_TYPES,
+        "shifts": app_validators.SHIFTS,
+        "tags": app_validators.TAGS,
+    }
+
+    objects = JobQuerySet.as_manager()
+
+    def sync_flags(self):
+        """
+        Update the bitmask columns from the JSON lists. Called by save, bulk paths
+        must call it themselves.
+        """
+        for field, choices in self.FLAG_CHOICES.items():
+            setattr(self, f"{field}_mask", to_bitmask(getattr(self, field), choices))
+
+    def save(self, *args, **kwargs):
+        self.sync_flags()
+        super().save(*args, **kwargs)
+
     def __repr__(self) -> str:
         return f"{self.id} - {self.title}"
 
@@ -267,6 +569,12 @@ class FeedBack(BaseModel):
     )
     text = models.TextField()
 
+    def save(self, *args, **kwargs):
+        # Account rating aggregates are updated by post_save handlers, keep them
+        # in the same transaction as the feedback itself
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
 
 class EmployerFeedback(FeedBack):
     class Meta:
@@ -312,9 +620,48 @@ class WorkSchedules(BaseModel):
 
     job_id: int
     job = models.ForeignKey(to=Job, on_delete=models.CASCADE, related_name="work_schedules")
-    schedules = JSONField(validators=[app_validators.validate_schedule])
+    schedules = models.JSONField(validators=[app_validators.validate_schedule])
+    # Bitmask of schedules over SCHEDULE, like the Job flag masks
+    schedules_mask = models.PositiveIntegerField(default=0, editable=False)
     time_from = models.TimeField()
     time_to = models.TimeField()
 
+    def sync_flags(self):
+        self.schedules_mask = to_bitmask(self.schedules, app_validators.SCHEDULE)
+
+    def save(self, *args, **kwargs):
+        self.sync_flags()
+        super().save(*args, **kwargs)
+
     def __repr__(self) -> str:
         return f"{self.job_id} - {self.schedules}"
+
+
+class OrphanedFile(BaseModel):
+    """
+    Stored media file no longer referenced, deleted by solution.media
+    """
+
+    id: int
+
+    name = models.CharField(max_length=255)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class RevokedToken(BaseModel):
+    """
+    API token, token family or user whose tokens issued before ``issued_before``
+    are denied, kept until they would have expired anyway. See
+    solution.api.authentication.
+    """
+
+    key = models.CharField(max_length=64, primary_key=True)
+    # Unix time in milliseconds
+    issued_before = models.BigIntegerField()
+    expires = models.DateTimeField(db_index=True)
+
+    def __repr__(self) -> str:
+        return self.key
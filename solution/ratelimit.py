@@ -0,0 +1,99 @@
+"""
+Sliding window rate limits for password checks, see settings.RATE_LIMITS.
+
+Attempts are counted in the cache per scope and identity (client IP,
+username) in fixed windows. The previous window is weighted by how much of
+it still overlaps the sliding window, which approximates a true sliding log
+with two counters. Callers check before hashing anything, so a credential
+stuffing burst is shed for the cost of a few cache increments.
+"""
+
+import hashlib
+import logging
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+
+def counter_key(scope: str, identity: str, window: int) -> str:
+    # Hashed so usernames can't produce keys memcached or the file cache reject
+    digest = hashlib.sha256(identity.encode()).hexdigest()[:32]
+    return f"ratelimit:{scope}:{digest}:{window}"
+
+
+def shed_key(scope: str) -> str:
+    return f"ratelimit-shed:{scope}"
+
+
+def client_ip(request: HttpRequest) -> str:
+    return request.META.get("REMOTE_ADDR") or ""
+
+
+def identities(request: HttpRequest, username: str | None = None) -> list[str]:
+    keys = [f"ip:{client_ip(request)}"]
+    if username:
+        keys.append(f"user:{username.lower()}")
+    return keys
+
+
+def increment(key: str, timeout: int | None) -> int:
+    cache.add(key, 0, timeout=timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Evicted in between
+        cache.set(key, 1, timeout=timeout)
+        return 1
+
+
+def attempt(scope: str, keys: list[str]) -> int | None:
+    """
+    Count an attempt for every key. Returns None when it's allowed, otherwise
+    the seconds to wait, and the attempt isn't counted.
+
+    Counters are incremented before they're compared, so of a concurrent burst
+    only as many attempts as the limit allows see a count below it.
+    """
+    limit, period = settings.RATE_LIMITS[scope]
+    now = time.time()
+    window = int(now // period)
+    overlap = 1 - (now % period) / period
+
+    counters = [
+        (counter_key(scope, key, window), counter_key(scope, key, window - 1)) for key in keys
+    ]
+    previous_counts = cache.get_many([previous for _, previous in counters])
+    counted = []
+    for current, previous in counters:
+        # Kept for two windows, the next one weighs it as the previous window
+        count = increment(current, 2 * period)
+        counted.append(current)
+        # Attempts before this one
+        if previous_counts.get(previous, 0) * overlap + count - 1 >= limit:
+            for key in counted:
+                try:
+                    cache.decr(key)
+                except ValueError:
+                    pass
+            shed(scope)
+            return max(1, math.ceil(overlap * period))
+
+    return None
+
+
+def shed(scope: str):
+    logger.warning("Rate limit exceeded for %s", scope)
+    increment(shed_key(scope), None)
+
+
+def shed_counts() -> dict[str, int]:
+    """
+    Attempts rejected so far, by scope
+    """
+    counts = cache.get_many([shed_key(scope) for scope in settings.RATE_LIMITS])
+    return {scope: counts.get(shed_key(scope), 0) for scope in settings.RATE_LIMITS}
@@ -0,0 +1,218 @@
+"""
+Full-text search over Job title, description and location.
+
+SQLite keeps the documents in an FTS5 virtual table and PostgreSQL in a
+tsvector side table with a GIN index. Both are created by a migration and
+kept up to date by the Job signals in solution.signals.
+"""
+
+import re
+import uuid
+from typing import Iterable, Sequence
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from solution.utils import chunked
+
+SEARCH_FIELDS = ("title", "description", "location")
+
+# Both backends are fed plain word tokens, so user input can never be parsed
+# as FTS5 or tsquery syntax
+token_re = re.compile(r"\w+")
+
+
+def tokenize(query: str) -> list[str]:
+    return token_re.findall(query.lower())
+
+
+class SearchBackend:
+    create_sql: Sequence[str] = ()
+    drop_sql: Sequence[str] = ()
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def create(self, cursor):
+        for sql in self.create_sql:
+            cursor.execute(sql)
+
+    def drop(self, cursor):
+        for sql in self.drop_sql:
+            cursor.execute(sql)
+
+    def index(self, cursor, rows: Sequence[tuple]):
+        """
+        Insert or replace the documents of ``(id, title, description, location)`` rows
+        """
+        raise NotImplementedError
+
+    def remove(self, cursor, ids: Sequence[uuid.UUID]):
+        raise NotImplementedError
+
+    def prune(self, cursor):
+        """
+        Remove documents of jobs that no longer exist
+        """
+        raise NotImplementedError
+
+    def search(self, cursor, tokens: list[str], limit: int, offset: int) -> list[tuple]:
+        """
+        Return ``(id, rank)`` rows of open jobs, best match first. Finished jobs
+        are filtered before LIMIT and OFFSET so pages stay full.
+        """
+        raise NotImplementedError
+
+
+class SQLiteSearchBackend(SearchBackend):
+    create_sql = (
+        "CREATE VIRTUAL TABLE solution_job_fts USING fts5("
+        "job_id UNINDEXED, title, description, location, tokenize = 'porter unicode61')",
+    )
+    drop_sql = ("DROP TABLE IF EXISTS solution_job_fts",)
+
+    # Column weights for bm25(), in table order
+    weights = (0.0, 10.0, 1.0, 5.0)
+
+    @staticmethod
+    def rowid(value: uuid.UUID) -> int:
+        # FTS5 rows are keyed by an integer. The low 63 bits of the job UUID give a
+        # stable rowid, so documents are replaced and removed through the rowid
+        # index instead of scanning the unindexed job_id column.
+        return value.int & (2**63 - 1)
+
+    def index(self, cursor, rows):
+        self.remove(cursor, [row[0] for row in rows])
+        cursor.executemany(
+            "INSERT INTO solution_job_fts (rowid, job_id, title, description, location) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            [(self.rowid(pk), pk.hex, *fields) for pk, *fields in rows],
+        )
+
+    def remove(self, cursor, ids):
+        for chunk in chunked(ids, 500):
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"DELETE FROM solution_job_fts WHERE rowid IN ({placeholders})",
+                [self.rowid(pk) for pk in chunk],
+            )
+
+    def prune(self, cursor):
+        cursor.execute(
+            "DELETE FROM solution_job_fts WHERE job_id NOT IN (SELECT id FROM solution_job)"
+        )
+
+    def search(self, cursor, tokens, limit, offset):
+        # Every token must match, the last one as a prefix for search-as-you-type
+        match = " ".join(f'"{token}"' for token in tokens) + "*"
+        weights = ", ".join(str(weight) for weight in self.weights)
+        cursor.execute(
+            f"SELECT job_id, -bm25(solution_job_fts, {weights}) AS rank FROM solution_job_fts "
+            "JOIN solution_job ON solution_job.id = solution_job_fts.job_id "
+            "WHERE solution_job_fts MATCH %s AND NOT solution_job.done "
+            "ORDER BY rank DESC, job_id LIMIT %s OFFSET %s",
+            [match, limit, offset],
+        )
+        return [(uuid.UUID(pk), rank) for pk, rank in cursor.fetchall()]
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    create_sql = (
+        "CREATE TABLE solution_job_search ("
+        "job_id uuid PRIMARY KEY REFERENCES solution_job (id) "
+        "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+        "document tsvector NOT NULL)",
+        "CREATE INDEX solution_job_search_document_idx "
+        "ON solution_job_search USING GIN (document)",
+    )
+    drop_sql = ("DROP TABLE IF EXISTS solution_job_search",)
+
+    document_sql = (
+        "setweight(to_tsvector('english', %s), 'A') || "
+        "setweight(to_tsvector('english', %s), 'C') || "
+        "setweight(to_tsvector('english', %s), 'B')"
+    )
+
+    def index(self, cursor, rows):
+        cursor.executemany(
+            f"INSERT INTO solution_job_search (job_id, document) VALUES (%s, {self.document_sql}) "
+            "ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document",
+            rows,
+        )
+
+    def remove(self, cursor, ids):
+        cursor.execute("DELETE FROM solution_job_search WHERE job_id = ANY(%s)", [list(ids)])
+
+    def prune(self, cursor):
+        # Documents are removed with their job by the foreign key cascade
+        pass
+
+    def search(self, cursor, tokens, limit, offset):
+        query = " & ".join(tokens) + ":*"
+        cursor.execute(
+            "SELECT job_id, ts_rank_cd(document, query) AS rank "
+            "FROM solution_job_search JOIN solution_job ON solution_job.id = job_id, "
+            "to_tsquery('english', %s) query "
+            "WHERE document @@ query AND NOT solution_job.done "
+            "ORDER BY rank DESC, job_id LIMIT %s OFFSET %s",
+            [query, limit, offset],
+        )
+        return cursor.fetchall()
+
+
+backends: dict[str, type[SearchBackend]] = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgreSQLSearchBackend,
+}
+
+
+def get_backend(using: str = DEFAULT_DB_ALIAS) -> SearchBackend:
+    connection = connections[using]
+    try:
+        return backends[connection.vendor](connection)
+    except KeyError:
+        raise ImproperlyConfigured(f"Full-text search is not supported on {connection.vendor}")
+
+
+def index_rows(rows: Sequence[tuple], using: str = DEFAULT_DB_ALIAS):
+    if not rows:
+        return
+
+    backend = get_backend(using)
+    with backend.connection.cursor() as cursor:
+        backend.index(cursor, rows)
+
+
+def index_jobs(jobs: Iterable, using: str = DEFAULT_DB_ALIAS):
+    index_rows([(job.pk, *(getattr(job, x) for x in SEARCH_FIELDS)) for job in jobs], using)
+
+
+def remove_jobs(ids: Sequence[uuid.UUID], using: str = DEFAULT_DB_ALIAS):
+    if not ids:
+        return
+
+    backend = get_backend(using)
+    with backend.connection.cursor() as cursor:
+        backend.remove(cursor, ids)
+
+
+def prune(using: str = DEFAULT_DB_ALIAS):
+    backend = get_backend(using)
+    with backend.connection.cursor() as cursor:
+        backend.prune(cursor)
+
+
+def search_jobs(
+    query: str, limit: int = 20, offset: int = 0, using: str = DEFAULT_DB_ALIAS
+) -> list[tuple[uuid.UUID, float]]:
+    """
+    Return ``(job id, rank)`` pairs of open jobs matching every word of ``query``, best
+    match first
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    backend = get_backend(using)
+    with backend.connection.cursor() as cursor:
+        return backend.search(cursor, tokens, limit, offset)
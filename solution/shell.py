@@ -0,0 +1,101 @@
+"""
+The single page app shell served by IndexView for every frontend route.
+
+The template is rendered once per process with placeholder values, split
+around them and kept as bytes, so a request only splices in its user data and
+CSRF token. With DEBUG on, the template is rendered again on every access so
+template and Vite changes show up without a restart.
+"""
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+import orjson
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.template.loader import render_to_string
+
+USER_DATA = "user_data"
+CSRF_TOKEN = "csrf_token"
+
+# Rendered in place of the per request values, then cut out of the shell. The
+# user data goes through json_script, which quotes the string.
+placeholders = {USER_DATA: "__shell_user_data__", CSRF_TOKEN: "__shell_csrf_token__"}
+markers = {
+    USER_DATA: json.dumps(placeholders[USER_DATA]).encode(),
+    CSRF_TOKEN: placeholders[CSRF_TOKEN].encode(),
+}
+
+# Same escapes as the json_script filter, the data may contain "</script>"
+json_script_escapes = ((b"<", b"\\u003C"), (b">", b"\\u003E"), (b"&", b"\\u0026"))
+
+
+def dump_json_script(value: Any) -> bytes:
+    data = orjson.dumps(value)
+    for char, escaped in json_script_escapes:
+        data = data.replace(char, escaped)
+    return data
+
+
+@dataclass(frozen=True)
+class Shell:
+    # The template output is parts[0] + slot 0 + parts[1] + slot 1 + ... + parts[-1]
+    parts: tuple[bytes, ...]
+    slots: tuple[str, ...]
+    digest: str
+
+    def render(self, user_data: dict[str, Any], csrf_token: str) -> bytes:
+        values = {USER_DATA: dump_json_script(user_data), CSRF_TOKEN: csrf_token.encode()}
+        chunks = [self.parts[0]]
+        for slot, part in zip(self.slots, self.parts[1:]):
+            chunks.append(values[slot])
+            chunks.append(part)
+        return b"".join(chunks)
+
+
+def build(template_name: str) -> Shell:
+    html = render_to_string(template_name, placeholders).encode()
+
+    positions = []
+    for slot, marker in markers.items():
+        if html.count(marker) != 1:
+            raise ImproperlyConfigured(f"{template_name} must render {slot} exactly once")
+        positions.append((html.index(marker), slot))
+    positions.sort()
+
+    parts = []
+    start = 0
+    for position, slot in positions:
+        parts.append(html[start:position])
+        start = position + len(markers[slot])
+    parts.append(html[start:])
+
+    return Shell(
+        parts=tuple(parts),
+        slots=tuple(slot for _, slot in positions),
+        digest=hashlib.sha256(html).hexdigest(),
+    )
+
+
+shells: dict[str, Shell] = {}
+lock = threading.Lock()
+
+
+def get(template_name: str) -> Shell:
+    if settings.DEBUG:
+        return build(template_name)
+
+    shell = shells.get(template_name)
+    if shell is not None:
+        return shell
+
+    with lock:
+        shell = shells.get(template_name)
+        if shell is None:
+            shell = build(template_name)
+            shells[template_name] = shell
+
+    return shell
@@ -0,0 +1,199 @@
+import functools
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from solution import aggregates, images, media, search
+from solution import models as app_models
+from solution.api import reference
+
+
+@receiver(post_save, sender=app_models.Job)
+def index_job(sender, instance: app_models.Job, using, raw=False, **kwargs):
+    if not raw:
+        search.index_jobs([instance], using=using)
+
+
+@receiver(post_delete, sender=app_models.Job)
+def unindex_job(sender, instance: app_models.Job, using, **kwargs):
+    search.remove_jobs([instance.pk], using=using)
+
+
+@receiver(pre_save, sender=app_models.EmployerFeedback)
+@receiver(pre_save, sender=app_models.WorkerFeedback)
+@receiver(pre_delete, sender=app_models.EmployerFeedback)
+@receiver(pre_delete, sender=app_models.WorkerFeedback)
+def load_stored_rating(sender, instance, using, raw=False, **kwargs):
+    """
+    Make sure the rated account and rating of the stored row are known before it
+    changes. Instances built by hand or loaded with only() don't carry them.
+    """
+    if raw or instance.pk is None:
+        return
+
+    _, field = aggregates.rated_accounts[sender]
+    attnames = (f"{field}_id", "rating")
+    loaded = getattr(instance, "_loaded_values", {})
+    if all(attname in loaded for attname in attnames):
+        return
+
+    row = sender._base_manager.using(using).filter(pk=instance.pk).values(*attnames).first()
+    if row is not None:
+        instance._loaded_values = {**loaded, **row}
+
+
+@receiver(post_save, sender=app_models.EmployerFeedback)
+@receiver(post_save, sender=app_models.WorkerFeedback)
+def rate_account(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    model, field = aggregates.rated_accounts[sender]
+    attname = f"{field}_id"
+    account_id = getattr(instance, attname)
+    old_account_id = None if created else instance.loaded_value(attname)
+    old_rating = 0 if created else instance.loaded_value("rating", 0)
+
+    if old_account_id == account_id:
+        if account_id is not None:
+            aggregates.add_rating(model, account_id, instance.rating - old_rating, 0)
+        return
+
+    if old_account_id is not None:
+        aggregates.add_rating(model, old_account_id, -old_rating, -1)
+    if account_id is not None:
+        aggregates.add_rating(model, account_id, instance.rating, 1)
+
+
+@receiver(post_delete, sender=app_models.EmployerFeedback)
+@receiver(post_delete, sender=app_models.WorkerFeedback)
+def unrate_account(sender, instance, **kwargs):
+    model, field = aggregates.rated_accounts[sender]
+    # The stored values, the instance may have been changed without being saved
+    account_id = instance.loaded_value(f"{field}_id")
+    if account_id is not None:
+        aggregates.add_rating(model, account_id, -instance.loaded_value("rating", 0), -1)
+
+
+@receiver(post_save, sender=app_models.Job)
+def count_job_done(sender, instance: app_models.Job, created, raw=False, **kwargs):
+    if raw or created:
+        return
+
+    if instance.loaded_value("done", instance.done) != instance.done:
+        workers = instance.workers.values("pk")
+        aggregates.add_jobs_done(workers, 1 if instance.done else -1)
+
+
+@receiver(pre_delete, sender=app_models.Job)
+def uncount_job_done(sender, instance: app_models.Job, **kwargs):
+    # The workers relation is gone by post_delete
+    if instance.done:
+        aggregates.add_jobs_done(instance.workers.values("pk"), -1)
+
+
+@receiver(m2m_changed, sender=app_models.Job.workers.through)
+def count_job_workers(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("pre_remove", "pre_clear"):
+        # pk_set is not provided on clear, and on remove it holds every pk asked
+        # for, linked or not. Remember what is about to be removed.
+        related = instance.jobs if reverse else instance.workers
+        if action == "pre_remove":
+            related = related.filter(pk__in=pk_set)
+        instance._removed_pks = set(related.values_list("pk", flat=True))
+        return
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if action in ("post_remove", "post_clear"):
+        pk_set = instance.__dict__.pop("_removed_pks", set())
+
+    delta = 1 if action == "post_add" else -1
+    if reverse:
+        # A worker gained or lost jobs
+        done = app_models.Job.objects.filter(pk__in=pk_set, done=True).count()
+        aggregates.add_jobs_done([instance.pk], delta * done)
+    elif instance.done:
+        aggregates.add_jobs_done(pk_set, delta)
+
+
+def invalidate_reference_data(sender, using, **kwargs):
+    # Only once the rows are visible, a rebuild in between would store the old
+    # data under the new version
+    for name in reference.dependents[sender]:
+        transaction.on_commit(functools.partial(reference.invalidate, name), using=using)
+
+
+for model in reference.dependents:
+    post_save.connect(invalidate_reference_data, sender=model)
+    post_delete.connect(invalidate_reference_data, sender=model)
+
+
+@receiver(post_save, sender=app_models.WorkerAccount)
+@receiver(post_save, sender=app_models.EmployerAccount)
+def render_image_variants(
+    sender, instance, using, created, raw=False, update_fields=None, **kwargs
+):
+    if raw:
+        return
+
+    for field_name in images.IMAGE_FIELDS[sender._meta.label]:
+        if update_fields is not None and field_name not in update_fields:
+            continue
+
+        name = getattr(instance, field_name).name or ""
+        if name == (instance.loaded_value(field_name) or ""):
+            continue
+
+        # Drop the variants of the previous file until the new ones are rendered
+        variants_field = f"{field_name}_variants"
+        setattr(instance, variants_field, {})
+        if not created:
+            sender._default_manager.using(using).filter(pk=instance.pk).update(
+                **{variants_field: {}}
+            )
+
+        if name:
+            images.schedule_variants(instance, field_name, using)
+
+
+@receiver(pre_save, sender=app_models.WorkerAccount)
+@receiver(pre_save, sender=app_models.EmployerAccount)
+def stash_replaced_images(sender, instance, using, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding:
+        return
+
+    replaced = []
+    for field_name in images.IMAGE_FIELDS[sender._meta.label]:
+        if update_fields is not None and field_name not in update_fields:
+            continue
+
+        file = getattr(instance, field_name)
+        if not file._committed or file.name != instance.loaded_value(field_name):
+            replaced.append(field_name)
+
+    if replaced:
+        # Read from the row, the variants may be newer than the instance
+        old = (
+            sender._default_manager.using(using)
+            .only(*replaced, *(f"{field_name}_variants" for field_name in replaced))
+            .get(pk=instance.pk)
+        )
+        instance._replaced_files = media.file_names(old, replaced)
+
+
+@receiver(post_save, sender=app_models.WorkerAccount)
+@receiver(post_save, sender=app_models.EmployerAccount)
+def collect_replaced_images(sender, instance, using, raw=False, **kwargs):
+    replaced = instance.__dict__.pop("_replaced_files", None)
+    if replaced and not raw:
+        current = set(media.file_names(instance))
+        media.collect([name for name in replaced if name not in current], using)
+
+
+@receiver(post_delete, sender=app_models.WorkerAccount)
+@receiver(post_delete, sender=app_models.EmployerAccount)
+def collect_deleted_images(sender, instance, using, **kwargs):
+    media.collect(media.file_names(instance), using)
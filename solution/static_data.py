@@ -0,0 +1,57 @@
+"""
+JSON data shared with the frontend, from solution/frontend/static-data.
+
+Each file is read and parsed once per process and the same objects are
+returned to every caller, which must not mutate them. With DEBUG on, the file
+modification time is checked on access so edits show up without a restart.
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+import orjson
+from django.conf import settings
+
+STATIC_DATA_DIR = settings.BASE_DIR / "solution/frontend/static-data"
+
+
+@dataclass(frozen=True)
+class Loaded:
+    mtime_ns: int
+    data: Any
+
+
+loaded: dict[str, Loaded] = {}
+lock = threading.Lock()
+
+
+def load(name: str) -> Any:
+    entry = loaded.get(name)
+    if entry is not None and not settings.DEBUG:
+        return entry.data
+
+    path = STATIC_DATA_DIR / name
+    mtime_ns = os.stat(path).st_mtime_ns
+    if entry is not None and entry.mtime_ns == mtime_ns:
+        return entry.data
+
+    with lock:
+        entry = loaded.get(name)
+        if entry is None or entry.mtime_ns != mtime_ns:
+            entry = Loaded(mtime_ns, orjson.loads(path.read_bytes()))
+            loaded[name] = entry
+
+    return entry.data
+
+
+def company_sizes() -> dict[str, str]:
+    return load("companySizes.json")
+
+
+def seed_data() -> dict[str, Any]:
+    """
+    Reference lists and mock data of db.json
+    """
+    return load("db.json")
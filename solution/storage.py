@@ -0,0 +1,128 @@
+"""
+Content-addressed storage for account photos and logos, and the static files
+storage of production builds.
+
+Uploads are named by the SHA-256 of their content inside the directory given
+by upload_to, so identical files are stored once and a stored file never
+changes. Rows share files freely, solution.media only deletes a file once no
+row references it.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, Storage
+from django.utils.deconstruct import deconstructible
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    # Directory of files named by content hash, below the upload_to directory
+    content_directory = "sha256"
+    # Directory of files named after the stored file they're derived from, below its directory
+    derived_directory = "variants"
+
+    def content_name(self, name: str, content: File) -> str:
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+
+        directory = posixpath.dirname(name)
+        ext = posixpath.splitext(name)[1].lower()
+        hexdigest = digest.hexdigest()
+        return posixpath.join(directory, self.content_directory, hexdigest[:2], f"{hexdigest}{ext}")
+
+    def is_content_addressed(self, name: str) -> bool:
+        """
+        Names inside a content directory are kept as given. Files derived from a
+        stored file, like image variants, are named after it and so never change
+        either, also for files stored before names were content hashes.
+        """
+        name = f"/{name}"
+        return f"/{self.content_directory}/" in name or f"/{self.derived_directory}/" in name
+
+    def touch(self, name: str):
+        """
+        Mark a stored file as just written. Its new owner's transaction may not
+        have committed yet, so it is invisible to the orphan check, and
+        solution.media keeps recently written files for MEDIA_ORPHAN_GRACE_PERIOD.
+        """
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        if not self.is_content_addressed(name):
+            name = self.content_name(name, content)
+
+        # Same name, same content. Concurrent first uploads of a file may both
+        # write it, the loser gets a suffixed copy.
+        if self.exists(name):
+            self.touch(name)
+            return name
+
+        return super().save(name, content, max_length)
+
+
+content_storage = ContentAddressedStorage()
+
+
+VITE_DIRECTORY = "solution/"
+VITE_MANIFEST_NAME = VITE_DIRECTORY + "manifest.json"
+
+
+def read_vite_files(storage: Storage, name: str) -> frozenset[str]:
+    """
+    Static file names of the chunks, stylesheets and assets listed in the Vite
+    manifest stored under name, the files "vite build" named by content hash.
+    Empty without a build.
+    """
+    try:
+        with storage.open(name) as manifest_file:
+            manifest = json.load(manifest_file)
+    except FileNotFoundError:
+        return frozenset()
+
+    files = set()
+    for chunk in manifest.values():
+        files.add(chunk["file"])
+        files.update(chunk.get("css", ()))
+        files.update(chunk.get("assets", ()))
+    return frozenset(posixpath.join(VITE_DIRECTORY, file) for file in files)
+
+
+class ViteManifestStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    WhiteNoise's hashed and compressed static files, writing gzip and brotli
+    variants of each file on collectstatic.
+
+    The files listed in the Vite manifest are already named by content hash
+    and its chunks import each other by those names, so they're kept as is.
+    Every other file, including the rest of the Vite output directory, is
+    hashed by Django.
+    """
+
+    vite_files: frozenset[str] = frozenset()
+
+    def post_process(self, paths, dry_run=False, **options):
+        # Read from the source, with dry_run nothing has been copied
+        if VITE_MANIFEST_NAME in paths:
+            storage, path = paths[VITE_MANIFEST_NAME]
+            self.vite_files = read_vite_files(storage, path)
+        yield from super().post_process(paths, dry_run, **options)
+
+    def hashed_name(self, name, content=None, filename=None):
+        if self.clean_name(name) in self.vite_files:
+            return name
+        return super().hashed_name(name, content, filename)
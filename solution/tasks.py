@@ -0,0 +1,56 @@
+"""
+Work run off the request thread.
+
+Tasks are submitted once the current transaction commits, so they see the
+rows that scheduled them, and run in a small thread pool of this process.
+CPU bound steps are handed from there to a process pool.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+thread_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="solution-tasks")
+process_pool: ProcessPoolExecutor | None = None
+process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global process_pool
+    if process_pool is not None:
+        return process_pool
+
+    with process_pool_lock:
+        if process_pool is None:
+            # Forking a threaded server can copy held locks into the children, start
+            # fresh interpreters instead. Functions run there must not need Django set up.
+            process_pool = ProcessPoolExecutor(
+                max_workers=settings.BACKGROUND_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return process_pool
+
+
+def run(func: Callable, *args):
+    close_old_connections()
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("Background task %s failed", func.__qualname__)
+    finally:
+        connections.close_all()
+
+
+def submit(func: Callable, *args):
+    return thread_pool.submit(run, func, *args)
+
+
+def on_commit(func: Callable, *args, using: str = DEFAULT_DB_ALIAS):
+    transaction.on_commit(lambda: submit(func, *args), using=using)
@@ -1,6 +1,22 @@
+import base64
+import datetime
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import orjson
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.template.loader import render_to_string
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient, APITestCase
 
-from solution.models import User
+from solution import accounts, ratelimit, shell, tasks
+from solution.models import EmployerAccount, OrphanedFile, Profession, User, WorkerAccount
 
 
 class TestChangePassword(APITestCase):
@@ -52,3 +68,449 @@ class TestChangePassword(APITestCase):
         assert response.status_code == 400
         assert response.data["newPassword"]["detail"] == "Password is not valid."
         assert response.data["newPasswordConfirmation"]["detail"] == "Password is not valid."
+
+
+class AccountPurgeTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", "staff@email.com", "123", is_staff=True)
+        painter = Profession.objects.get(name="Painter")
+
+        for username in ("ann", "bob", "cid"):
+            user = User.objects.create_user(
+                username, f"{username}@email.com", "123", has_worker_account=True
+            )
+            WorkerAccount.objects.create(
+                user=user,
+                profession=painter,
+                first_name="John",
+                last_name="Doe",
+                birthdate=datetime.date(1990, 11, 8),
+                phone="10283017238917",
+                location="New York",
+            )
+
+        cls.employer = User.objects.get(username="cid")
+        cls.employer.has_employer_account = True
+        cls.employer.save()
+        EmployerAccount.objects.create(
+            user=cls.employer,
+            company_name="test",
+            address="test",
+            legal_name="test",
+            industry="test",
+            company_size="medium",
+            location="test",
+            role="test",
+            first_name="john",
+            last_name="doe",
+            phone="12345918723897",
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.staff)
+
+    def assert_purged(self):
+        assert not WorkerAccount.objects.exists()
+        assert not User.objects.filter(has_worker_account=True).exists()
+        # Only the flag of the deleted accounts is cleared
+        assert EmployerAccount.objects.count() == 1
+        assert User.objects.get(pk=self.employer.pk).has_employer_account
+
+    def test_purge(self):
+        response = self.client.delete("/solution-api/worker-account/_all")
+        assert response.status_code == 204
+        self.assert_purged()
+
+    def test_purge_in_chunks(self):
+        progress = []
+        assert accounts.purge_accounts(WorkerAccount, 2, progress.append) == 3
+        assert progress == [2, 3]
+        self.assert_purged()
+
+    def test_purge_collects_images_per_chunk(self):
+        for worker in WorkerAccount.objects.all():
+            WorkerAccount.objects.filter(pk=worker.pk).update(
+                photo=f"solution/worker/{worker.pk}.png"
+            )
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            accounts.purge_accounts(WorkerAccount, 2)
+
+        # One insert and one deletion task per chunk, not per account
+        assert len(callbacks) == 2
+        assert OrphanedFile.objects.count() == 3
+
+    def test_background_purge(self):
+        with mock.patch.object(tasks, "on_commit", lambda func, *args, **kwargs: func(*args)):
+            response = self.client.delete("/solution-api/worker-account/_all?background=true")
+
+        assert response.status_code == 202
+        assert response["Location"] == response.data["url"]
+        assert response.data["total"] == 3
+        self.assert_purged()
+
+        response = self.client.get(response.data["url"])
+        assert response.status_code == 200
+        assert response.data["deleted"] == 3
+        assert response.data["done"]
+
+    def test_staff_only(self):
+        self.client.force_authenticate(user=self.employer)
+        response = self.client.delete("/solution-api/worker-account/_all")
+        assert response.status_code == 404
+        assert WorkerAccount.objects.count() == 3
+
+        response = self.client.get("/solution-api/account-purges/unknown")
+        assert response.status_code == 403
+
+
+class AccountBulkTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", "staff@email.com", "123", is_staff=True)
+        for username in ("ann", "bob"):
+            User.objects.create_user(username, f"{username}@email.com", "123")
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.staff)
+
+    def worker(self, username, **fields):
+        return {
+            "user": username,
+            "profession": "Painter",
+            "firstName": "John",
+            "lastName": "Doe",
+            "birthdate": "1990-11-08",
+            "phone": "10283017238917",
+            "location": "New York",
+            **fields,
+        }
+
+    def post(self, *records):
+        body = b"\n".join(orjson.dumps(x) for x in records)
+        return self.client.post(
+            "/solution-api/worker-accounts/bulk", data=body, content_type="application/x-ndjson"
+        )
+
+    def test_bulk_create(self):
+        response = self.post(
+            self.worker("ann"),
+            self.worker("bob", profession="Astronaut"),
+            self.worker("nobody"),
+            self.worker("ann", firstName="Jane"),
+            self.worker("bob"),
+        )
+        assert response.status_code == 207
+        assert response.data["created"] == 2
+        assert [x["line"] for x in response.data["errors"]] == [2, 3, 4]
+        assert "profession" in response.data["errors"][0]["errors"]
+        assert "user" in response.data["errors"][1]["errors"]
+        assert "user" in response.data["errors"][2]["errors"]
+
+        assert set(WorkerAccount.objects.values_list("user__username", flat=True)) == {"ann", "bob"}
+        assert WorkerAccount.objects.get(user__username="ann").first_name == "John"
+        assert User.objects.filter(has_worker_account=True).count() == 2
+
+        response = self.post(self.worker("ann"))
+        assert response.status_code == 400
+        assert "user" in response.data["errors"][0]["errors"]
+
+    def test_staff_only(self):
+        self.client.force_authenticate(user=User.objects.get(username="ann"))
+        assert self.post(self.worker("ann")).status_code == 403
+
+
+class TokenAuthTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("jack", "jack@email.com", "MyP@ssw0rd")
+
+    def setUp(self):
+        cache.clear()
+
+    def obtain(self, password="MyP@ssw0rd"):
+        return self.client.post("/solution-api/tokens", {"username": "jack", "password": password})
+
+    def get_account(self, access):
+        return self.client.get(
+            "/solution-api/worker-account", HTTP_AUTHORIZATION=f"Bearer {access}"
+        )
+
+    def test_obtain_and_use(self):
+        response = self.obtain()
+        assert response.status_code == 200
+        assert response.data["expiresIn"] == settings.API_ACCESS_TOKEN_LIFETIME
+
+        with mock.patch("django.contrib.auth.hashers.PBKDF2PasswordHasher.verify") as verify:
+            assert self.get_account(response.data["access"]).status_code == 200
+        verify.assert_not_called()
+
+        assert self.obtain(password="wrong").status_code == 401
+        assert self.get_account("nonsense").status_code == 401
+        # A refresh token isn't an access token
+        assert self.get_account(response.data["refresh"]).status_code == 401
+
+    def test_expired(self):
+        access = self.obtain().data["access"]
+        later = time.time() + settings.API_ACCESS_TOKEN_LIFETIME + 1
+        with mock.patch("time.time", return_value=later):
+            assert self.get_account(access).status_code == 401
+
+    def test_refresh_rotates(self):
+        refresh = self.obtain().data["refresh"]
+        response = self.client.post("/solution-api/tokens/refresh", {"refresh": refresh})
+        assert response.status_code == 200
+        assert self.get_account(response.data["access"]).status_code == 200
+
+        # The old refresh token was used up
+        response = self.client.post("/solution-api/tokens/refresh", {"refresh": refresh})
+        assert response.status_code == 401
+
+    def test_refresh_reuse_revokes_family(self):
+        first = self.obtain().data
+        other = self.obtain().data
+        rotated = self.client.post("/solution-api/tokens/refresh", {"refresh": first["refresh"]})
+
+        # Replayed, every token issued from that login is revoked
+        response = self.client.post("/solution-api/tokens/refresh", {"refresh": first["refresh"]})
+        assert response.status_code == 401
+        assert self.get_account(rotated.data["access"]).status_code == 401
+        response = self.client.post(
+            "/solution-api/tokens/refresh", {"refresh": rotated.data["refresh"]}
+        )
+        assert response.status_code == 401
+
+        # Other logins are left alone
+        assert self.get_account(other["access"]).status_code == 200
+
+    def test_revocations_outlive_the_cache(self):
+        pair = self.obtain().data
+        self.client.post(
+            "/solution-api/tokens/revoke", HTTP_AUTHORIZATION=f"Bearer {pair['access']}"
+        )
+        cache.clear()
+        assert self.get_account(pair["access"]).status_code == 401
+
+    def test_revoke(self):
+        pair = self.obtain().data
+        response = self.client.post(
+            "/solution-api/tokens/revoke",
+            {"refresh": pair["refresh"]},
+            HTTP_AUTHORIZATION=f"Bearer {pair['access']}",
+        )
+        assert response.status_code == 204
+        assert self.get_account(pair["access"]).status_code == 401
+        response = self.client.post("/solution-api/tokens/refresh", {"refresh": pair["refresh"]})
+        assert response.status_code == 401
+
+    def test_password_change_revokes(self):
+        access = self.obtain().data["access"]
+        response = self.client.patch(
+            "/solution-api/change-password",
+            {
+                "oldPassword": "MyP@ssw0rd",
+                "newPassword": "N3wP@ssw0rd",
+                "newPasswordConfirmation": "N3wP@ssw0rd",
+            },
+            HTTP_AUTHORIZATION=f"Bearer {access}",
+        )
+        assert response.status_code == 204
+        assert self.get_account(access).status_code == 401
+        assert self.get_account(self.obtain("N3wP@ssw0rd").data["access"]).status_code == 200
+
+
+class CachedSessionTestCase(APITestCase):
+    def test_session_is_read_from_cache(self):
+        User.objects.create_user("jack", "jack@email.com", "123")
+        assert self.client.login(username="jack", password="123")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/solution-api/worker-account")
+        assert response.status_code == 200
+        assert not [x for x in queries if "django_session" in x["sql"]]
+
+
+@override_settings(RATE_LIMITS={"login": (2, 60), "register": (1, 60), "change-password": (1, 60)})
+class RateLimitTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("jack", "jack@email.com", "123")
+
+    def login(self, username="jack", password="wrong"):
+        return self.client.post("/login", {"email_username": username, "password": password})
+
+    def test_login(self):
+        assert self.login().status_code == 200
+        assert self.login().status_code == 200
+
+        with mock.patch("solution.views.authenticate") as authenticate:
+            response = self.login(password="123")
+        assert response.status_code == 429
+        authenticate.assert_not_called()
+
+        # The IP is over the limit as well
+        assert self.login(username="jill").status_code == 429
+
+    def test_sliding_window(self):
+        now = 1_000_000 * 60
+        with mock.patch("time.time", return_value=now):
+            assert self.login().status_code == 200
+            assert self.login().status_code == 200
+            assert self.login().status_code == 429
+
+        # Most of the previous window still counts
+        with mock.patch("time.time", return_value=now + 61):
+            assert self.login().status_code == 200
+            assert self.login().status_code == 429
+
+        with mock.patch("time.time", return_value=now + 150):
+            assert self.login().status_code == 200
+
+    def test_concurrent_attempts(self):
+        barrier = threading.Barrier(8)
+
+        def attempt(_):
+            barrier.wait()
+            return ratelimit.attempt("login", ["ip:10.0.0.1"])
+
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(attempt, range(8)))
+        assert results.count(None) == 2
+        assert ratelimit.shed_counts()["login"] == 6
+
+    def test_api(self):
+        self.client.force_authenticate(user=self.user)
+        data = {"oldPassword": "1", "newPassword": "1", "newPasswordConfirmation": "1"}
+        assert self.client.patch("/solution-api/change-password", data).status_code == 400
+
+        response = self.client.patch("/solution-api/change-password", data)
+        assert response.status_code == 429
+        assert int(response["Retry-After"]) > 0
+
+        response = self.client.post("/solution-api/tokens", {"username": "jack", "password": "1"})
+        assert response.status_code == 401
+
+    def test_no_basic_auth(self):
+        # Every API request would check a password outside the rate limits
+        credentials = base64.b64encode(b"jack:123").decode()
+        with mock.patch.object(User, "check_password") as check_password:
+            response = self.client.get(
+                "/solution-api/worker-account", HTTP_AUTHORIZATION=f"Basic {credentials}"
+            )
+        assert response.status_code in (401, 403)
+        check_password.assert_not_called()
+
+    def test_shed_counts(self):
+        for _ in range(4):
+            self.login()
+        data = {
+            "username": "jill",
+            "email": "jill@email.com",
+            "password": "123",
+            "confirmation": "1234",
+        }
+        self.client.post("/register", data)
+        assert self.client.post("/register", data).status_code == 429
+
+        self.client.force_authenticate(user=User.objects.create_user("staff", is_staff=True))
+        response = self.client.get("/solution-api/rate-limits")
+        assert response.data == {"login": 2, "register": 1, "change-password": 0}
+
+
+class RegisterTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user("Jack", "Jack@email.com", "123")
+
+    def register(self, username, email):
+        data = {"username": username, "email": email, "password": "123", "confirmation": "123"}
+        return self.client.post("/register", data)
+
+    def test_single_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.register("jill", "jill@email.com")
+        assert response.status_code == 302
+        assert User.objects.filter(username="jill", email="jill@email.com").exists()
+
+        user_queries = [x["sql"] for x in queries if '"solution_user"' in x["sql"]]
+        assert user_queries[0].startswith('INSERT INTO "solution_user"')
+        assert not [x for x in user_queries if x.startswith("SELECT")]
+
+    def test_taken_email(self):
+        response = self.register("jill", "JACK@email.com")
+        assert response.status_code == 200
+        assert "email" in response.context["form_errors"]
+        assert not User.objects.filter(username="jill").exists()
+
+    def test_taken_username(self):
+        response = self.register("JACK", "jack2@email.com")
+        assert response.status_code == 302
+        assert User.objects.get(email="jack2@email.com").username.startswith("JACK_")
+
+    def test_case_insensitive_constraints(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user("jack", "other@email.com")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            User.objects.create_user("other", "jack@EMAIL.com")
+        # Blank emails aren't unique
+        User.objects.create_user("ann")
+        User.objects.create_user("bob")
+
+
+class IndexShellTestCase(APITestCase):
+    user_data_re = re.compile(rb'<script id="userData" type="application/json">(.*?)</script>')
+    csrf_token_re = re.compile(rb'name="csrfmiddlewaretoken" value="(\w+)"')
+
+    def user_data(self, response):
+        return orjson.loads(self.user_data_re.search(response.content).group(1))
+
+    def test_user_data(self):
+        response = self.client.get("/jobs/feed")
+        assert response.status_code == 200
+        assert self.user_data(response) == {
+            "firstName": None,
+            "lastName": None,
+            "username": "",
+            "authenticated": False,
+            "hasAccount": False,
+        }
+        assert self.csrf_token_re.search(response.content)
+
+        user = User.objects.create_user("jack", first_name="</script>", last_name="&")
+        self.client.force_login(user)
+        response = self.client.get("/jobs/feed")
+        assert b"</script>&" not in response.content
+        assert self.user_data(response) == {
+            "firstName": "</script>",
+            "lastName": "&",
+            "username": "jack",
+            "authenticated": True,
+        }
+        assert "ETag" not in response.headers
+
+    def test_not_modified(self):
+        client = Client(enforce_csrf_checks=True)
+        response = client.get("/")
+        etag = response.headers["ETag"]
+        token = self.csrf_token_re.search(response.content).group(1).decode()
+
+        response = client.get("/jobs", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+
+        # The token of the cached page is still accepted
+        response = client.post("/login", {"csrfmiddlewaretoken": token})
+        assert response.status_code == 200
+
+        # A new session has another CSRF secret
+        response = Client().get("/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    @override_settings(DEBUG=False)
+    def test_rendered_once(self):
+        shell.shells.clear()
+        with mock.patch("solution.shell.render_to_string", wraps=render_to_string) as render:
+            for path in ("/", "/jobs", "/profile/edit"):
+                assert self.client.get(path).status_code == 200
+        assert render.call_count == 1
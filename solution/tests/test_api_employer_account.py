@@ -2,9 +2,12 @@ from datetime import datetime
 from typing import Callable
 
 import pytest
+from django.test import RequestFactory
 from rest_framework.test import APIClient, APITestCase
 
-from solution.models import User
+from solution.api.projection import Projection
+from solution.api.serializers import EmployerAccountSerializer
+from solution.models import EmployerAccount, User
 
 
 @pytest.mark.usefixtures("get_image_file", "get_image_path", "api_user", "format_datetime")
@@ -13,7 +16,7 @@ class EmployerAccountTestCase(APITestCase):
     user: User
     auth_client: APIClient
     get_image_file: Callable
-    get_image_path: Callable[[int, str], str]
+    get_image_path: Callable[[str], str]
     format_datetime: Callable
 
     def setUp(self):
@@ -33,6 +36,8 @@ class EmployerAccountTestCase(APITestCase):
             "lastName": "Doe",
             "phone": "12345918723897",
             "verifiedId": False,
+            "rating": 0,
+            "reviewCount": 0,
             "lastUpdate": self.format_datetime(datetime.now()),
         }
 
@@ -66,14 +71,27 @@ class EmployerAccountTestCase(APITestCase):
 
         assert response.data == self.employer_account
 
+    def test_projection_matches_serializer(self):
+        self.create_account(has_photo=True)
+        self.auth_client.force_authenticate(user=User.objects.create_user("ann"))
+        self.create_account(has_photo=False)
+        self.auth_client.force_authenticate(user=self.user)
+
+        queryset = EmployerAccount.objects.order_by("user")
+        serializer = EmployerAccountSerializer(
+            queryset, many=True, context={"request": RequestFactory().get("/")}
+        )
+        assert len(serializer.data) == 2
+        assert list(Projection(serializer.child).rows(queryset)) == serializer.data
+
     def test_create_account_with_photo(self):
         response = self.create_account(has_photo=True)
         assert response.status_code == 201
 
         response.data["lastUpdate"] = self.format_datetime(response.data["lastUpdate"])
 
-        self.employer_account["logo"] = self.get_image_path(self.user.id, "employer/logo")
-        self.employer_account["personalPhoto"] = self.get_image_path(self.user.id, "employer/photo")
+        self.employer_account["logo"] = self.get_image_path("employer/logo")
+        self.employer_account["personalPhoto"] = self.get_image_path("employer/photo")
 
         assert response.data == self.employer_account
 
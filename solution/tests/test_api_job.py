@@ -1,5 +1,18 @@
+import base64
+import datetime
+import io
+from unittest import mock
+
+import orjson
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from rest_framework.test import APITestCase
 
+from solution import search
+from solution.api.bulk import BulkCreateView
+from solution.models import EmployerAccount, Job, JobTag, User, WorkSchedules
+
 
 class JobDataTestCase(APITestCase):
     def test_job_data_api(self):
@@ -14,3 +27,418 @@ class JobDataTestCase(APITestCase):
         assert len(response.data["shifts"]) > 0
         assert len(response.data["days_schedule"]) > 0
         assert len(response.data["tags"]) > 0
+
+    def test_job_data_etag(self):
+        response = self.client.get("/solution-api/job-data")
+        etag = response["ETag"]
+        assert response.json()["tags"] == response.data["tags"]
+
+        response = self.client.get("/solution-api/job-data", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        with self.captureOnCommitCallbacks(execute=True):
+            JobTag.objects.create(name="Night Owl")
+            # The version only moves once the new row is committed
+            response = self.client.get("/solution-api/job-data", HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304
+
+        response = self.client.get("/solution-api/job-data", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert "Night Owl" in response.json()["tags"]
+
+    def test_roles_etag(self):
+        response = self.client.get("/solution-api/roles")
+        assert response.status_code == 200
+        assert isinstance(response.json(), list)
+
+        response = self.client.get("/solution-api/roles", HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == 304
+
+
+def create_employer(username="jack"):
+    user = User.objects.create_user(username, f"{username}@email.com", "123")
+    return EmployerAccount.objects.create(
+        user=user,
+        company_name="test",
+        address="test",
+        legal_name="test",
+        industry="test",
+        company_size="medium",
+        location="test",
+        role="test",
+        first_name="john",
+        last_name="doe",
+        phone="12345918723897",
+    )
+
+
+def create_job(employer, **fields):
+    data = {
+        "title": "test",
+        "start_date": datetime.date.today(),
+        "description": "test",
+        "location": "test",
+        "types": ["Part-Time"],
+        "shifts": ["Day Shift"],
+        "responsibilities": ["test"],
+        "qualifications": ["test"],
+        "benefits": ["test"],
+        "min_salary": 0,
+        "max_salary": 50_000,
+        "period_salary": "hour",
+        "application_instructions": "test",
+        "tags": ["Temporary"],
+        **fields,
+    }
+    return Job.objects.create(employer=employer, **data)
+
+
+class JobFeedTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = create_employer()
+
+        cls.jobs = []
+        for i in range(5):
+            job = create_job(cls.employer, title=f"job {i}")
+            WorkSchedules.objects.create(
+                job=job,
+                schedules=["Monday to Friday"],
+                time_from=datetime.time(8),
+                time_to=datetime.time(17),
+            )
+            cls.jobs.append(job)
+
+        # Same posted date forces the id tiebreaker to be used
+        Job.objects.filter(pk__in=[cls.jobs[1].pk, cls.jobs[2].pk]).update(
+            posted_date=cls.jobs[1].posted_date
+        )
+        Job.objects.filter(pk=cls.jobs[4].pk).update(done=True)
+
+    def test_job_feed_pages(self):
+        expected = list(
+            Job.objects.filter(done=False)
+            .order_by("-posted_date", "-id")
+            .values_list("id", flat=True)
+        )
+
+        seen = []
+        url = "/solution-api/jobs?pageSize=2"
+        while url:
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+
+            assert response.status_code == 200
+            assert len(response.data["results"]) <= 2
+            seen += [result["id"] for result in response.data["results"]]
+            url = response.data["next"]
+
+        assert seen == [str(x) for x in expected]
+
+    def test_job_feed_representation(self):
+        response = self.client.get("/solution-api/jobs?pageSize=1")
+        job = response.data["results"][0]
+
+        assert job["employer"] == {
+            "companyName": "test",
+            "logo": None,
+            "description": "",
+            "verifiedId": False,
+        }
+        assert job["workSchedules"] == [
+            {"schedules": ["Monday to Friday"], "timeFrom": "08:00:00", "timeTo": "17:00:00"}
+        ]
+        assert job["postedDate"]
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/solution-api/jobs?cursor=invalid")
+        assert response.status_code == 404
+
+        # Well formed, but not the values of the ordering fields
+        for position in ([1, 2], [None, None], ["2024-01-01", None], ["yesterday", "1"]):
+            cursor = base64.urlsafe_b64encode(orjson.dumps(position)).decode()
+            response = self.client.get(f"/solution-api/jobs?cursor={cursor}")
+            assert response.status_code == 404, position
+
+
+class JobSearchTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        employer = create_employer()
+        cls.painter = create_job(
+            employer, title="House painter", description="Paint walls", location="New York"
+        )
+        cls.electrician = create_job(
+            employer,
+            title="Electrician",
+            description="Wiring for a painted house",
+            location="Boston",
+        )
+        cls.gardener = create_job(
+            employer, title="Gardener", description="Mow the lawn", location="New York"
+        )
+
+    def search(self, query):
+        response = self.client.get("/solution-api/jobs/search", {"q": query})
+        assert response.status_code == 200
+        return [job["id"] for job in response.data["results"]]
+
+    def test_ranked_search(self):
+        # Title matches rank above description matches
+        assert self.search("paint house") == [str(self.painter.pk), str(self.electrician.pk)]
+        assert set(self.search("new york")) == {str(self.painter.pk), str(self.gardener.pk)}
+        assert self.search("garde") == [str(self.gardener.pk)]
+        assert self.search("  ") == []
+        # Query syntax is not passed through
+        assert self.search('painter" *(') == [str(self.painter.pk)]
+
+    def test_index_follows_saves_and_deletes(self):
+        self.gardener.title = "Landscaper"
+        self.gardener.save()
+        assert self.search("landscaper") == [str(self.gardener.pk)]
+        assert self.search("gardener") == []
+
+        self.gardener.delete()
+        assert self.search("landscaper") == []
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM solution_job_fts")
+        assert self.search("electrician") == []
+
+        call_command("rebuild_job_search_index", workers=1, stdout=io.StringIO())
+        assert self.search("electrician") == [str(self.electrician.pk)]
+
+    def test_search_pages(self):
+        response = self.client.get("/solution-api/jobs/search", {"q": "new york", "limit": 1})
+        assert len(response.data["results"]) == 1
+        assert response.data["next"]
+
+        response = self.client.get(response.data["next"])
+        assert len(response.data["results"]) == 1
+        assert response.data["next"] is None
+
+    def test_finished_jobs_dont_shorten_pages(self):
+        employer = self.painter.employer
+        for i in range(3):
+            create_job(employer, title=f"New York painter {i}", location="New York", done=True)
+
+        response = self.client.get("/solution-api/jobs/search", {"q": "new york", "limit": 1})
+        assert len(response.data["results"]) == 1
+        response = self.client.get(response.data["next"])
+        assert len(response.data["results"]) == 1
+        assert response.data["next"] is None
+
+    def test_equal_ranks_page_stably(self):
+        employer = self.painter.employer
+        welders = {
+            str(create_job(employer, title="Welder", location="Denver").pk) for _ in range(5)
+        }
+
+        seen = []
+        response = self.client.get("/solution-api/jobs/search", {"q": "welder", "limit": 2})
+        seen += [job["id"] for job in response.data["results"]]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            seen += [job["id"] for job in response.data["results"]]
+        # Equal ranks are ordered by id, every job shows up once
+        assert seen == sorted(welders)
+
+
+class JobFlagsTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        employer = create_employer()
+        cls.day = create_job(
+            employer, types=["Full-Time"], shifts=["Day Shift"], tags=["Urgently hiring"]
+        )
+        cls.night = create_job(
+            employer, types=["Full-Time", "Contract"], shifts=["Night Shift"], tags=["Temporary"]
+        )
+        cls.part_time = create_job(
+            employer,
+            types=["Part-Time"],
+            shifts=["Night Shift", "4 Hour Shift"],
+            tags=["Hiring multiple candidates"],
+        )
+
+    def feed(self, **params):
+        response = self.client.get("/solution-api/jobs", params)
+        assert response.status_code == 200
+        return {job["id"] for job in response.data["results"]}
+
+    def test_masks_follow_lists(self):
+        assert (self.night.types_mask, self.night.shifts_mask, self.night.tags_mask) == (
+            0b1010,
+            0b10,
+            0b100,
+        )
+
+        self.night.types = ["Overtime"]
+        self.night.save()
+        self.night.refresh_from_db()
+        assert self.night.types_mask == 0b100
+
+    def test_with_flags(self):
+        jobs = Job.objects.with_flags(types=["Full-Time"], shifts=["Night Shift"])
+        assert list(jobs) == [self.night]
+
+        jobs = Job.objects.with_flags(shifts=["Day Shift", "4 Hour Shift"])
+        assert set(jobs) == {self.day, self.part_time}
+
+        assert not Job.objects.with_flags(types=["Internship"]).exists()
+        assert Job.objects.with_flags().count() == 3
+
+    def test_feed_filters(self):
+        assert self.feed(types="Full-Time", shifts="Night Shift") == {str(self.night.pk)}
+        assert self.feed(shifts=["Day Shift", "4 Hour Shift"]) == {
+            str(self.day.pk),
+            str(self.part_time.pk),
+        }
+        assert self.feed(tags="Temporary,Urgently hiring") == {str(self.day.pk), str(self.night.pk)}
+
+
+class JobFacetsTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        employer = create_employer()
+        day = create_job(employer, types=["Full-Time"], shifts=["Day Shift"])
+        night = create_job(employer, types=["Full-Time", "Contract"], shifts=["Night Shift"])
+        create_job(employer, types=["Part-Time"], shifts=["Night Shift"], done=True)
+
+        for job, schedules in (
+            (day, ["Monday", "Tuesday"]),
+            (day, ["Monday", "Weekend"]),
+            (night, ["Weekend"]),
+        ):
+            WorkSchedules.objects.create(
+                job=job, schedules=schedules, time_from=datetime.time(8), time_to=datetime.time(17)
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_facets(self):
+        with self.assertNumQueries(2):
+            response = self.client.get("/solution-api/jobs/facets")
+
+        assert response.status_code == 200
+        assert response.data["types"] == {
+            "Part-Time": 0,
+            "Full-Time": 2,
+            "Overtime": 0,
+            "Contract": 1,
+            "Internship": 0,
+        }
+        assert response.data["shifts"]["Day Shift"] == 1
+        assert response.data["shifts"]["Night Shift"] == 1
+        assert response.data["tags"]["Temporary"] == 2
+        assert response.data["schedules"]["Monday"] == 1
+        assert response.data["schedules"]["Weekend"] == 2
+        assert response.data["schedules"]["Sunday"] == 0
+
+    def test_filtered_facets(self):
+        response = self.client.get("/solution-api/jobs/facets", {"schedules": "Weekend,Friday"})
+        assert response.data["types"]["Full-Time"] == 2
+
+        response = self.client.get(
+            "/solution-api/jobs/facets", {"types": "Contract", "schedules": "Weekend"}
+        )
+        assert response.data["types"] == {
+            "Part-Time": 0,
+            "Full-Time": 1,
+            "Overtime": 0,
+            "Contract": 1,
+            "Internship": 0,
+        }
+        assert response.data["schedules"]["Weekend"] == 1
+        assert response.data["schedules"]["Monday"] == 0
+
+    def test_facets_are_cached(self):
+        self.client.get("/solution-api/jobs/facets", {"types": ["Contract", "Full-Time"]})
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/solution-api/jobs/facets", {"types": "Full-Time,Contract"})
+
+        assert response.data["types"]["Full-Time"] == 2
+
+
+class JobBulkTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = create_employer()
+        cls.employer.user.has_employer_account = True
+        cls.employer.user.save()
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.employer.user)
+
+    def post(self, *records: dict | str):
+        body = "\n".join(x if isinstance(x, str) else orjson.dumps(x).decode() for x in records)
+        return self.client.post(
+            "/solution-api/jobs/bulk", data=body, content_type="application/x-ndjson"
+        )
+
+    def job(self, **fields):
+        return {
+            "title": "Bulk painter",
+            "startDate": datetime.date.today().isoformat(),
+            "description": "Paint walls",
+            "location": "Boston",
+            "types": ["Full-Time"],
+            "shifts": ["Night Shift"],
+            "responsibilities": ["Paint"],
+            "qualifications": ["None"],
+            "benefits": ["None"],
+            "minSalary": 10,
+            "maxSalary": 20,
+            "periodSalary": "hour",
+            "applicationInstructions": "test",
+            "tags": ["Temporary"],
+            **fields,
+        }
+
+    def test_bulk_create(self):
+        response = self.post(self.job(), self.job(title="Bulk gardener"))
+        assert response.status_code == 201
+        assert response.data == {"created": 2, "errors": []}
+
+        jobs = Job.objects.filter(employer=self.employer).order_by("title")
+        assert [job.title for job in jobs] == ["Bulk gardener", "Bulk painter"]
+        assert set(Job.objects.with_flags(shifts=["Night Shift"])) == set(jobs)
+        assert [pk for pk, _ in search.search_jobs("gardener")] == [jobs[0].pk]
+
+    def test_errors_by_line(self):
+        response = self.post(
+            self.job(),
+            "{not json",
+            "",
+            self.job(types=["Forever"]),
+            "[]",
+            self.job(id="4b7bd2b4-51ab-4c6b-a5b4-b3b8a1dfc3f0", maxSalary=-1),
+        )
+        assert response.status_code == 207
+        assert response.data["created"] == 1
+        assert [x["line"] for x in response.data["errors"]] == [2, 4, 5, 6]
+        assert "errors" in response.data["errors"][0]["errors"]
+        assert "types" in response.data["errors"][1]["errors"]
+        assert "maxSalary" in response.data["errors"][3]["errors"]
+        assert Job.objects.count() == 1
+
+    def test_chunks(self):
+        with mock.patch.object(BulkCreateView, "chunk_size", 2):
+            response = self.post(*(self.job(title=f"job {i}") for i in range(5)), "{")
+        assert response.status_code == 207
+        assert response.data["created"] == 5
+        assert response.data["errors"][0]["line"] == 6
+
+    def test_nothing_created(self):
+        response = self.post(self.job(types=["Forever"]))
+        assert response.status_code == 400
+        assert response.data["created"] == 0
+
+    def test_employers_only(self):
+        user = User.objects.create_user("jill", "jill@email.com", "123")
+        self.client.force_authenticate(user=user)
+        assert self.post(self.job()).status_code == 403
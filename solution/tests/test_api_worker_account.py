@@ -1,10 +1,30 @@
+import io
+import os
+import shutil
+import tempfile
+import time
 from datetime import datetime
+from pathlib import Path
 from typing import Callable
+from unittest import mock
 
+import orjson
 import pytest
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from drf_spectacular.generators import SchemaGenerator
+from PIL import Image
 from rest_framework.test import APIClient, APITestCase
 
-from solution.models import User
+from solution import images, media
+from solution.api.api_views import WorkerAccountView
+from solution.api.projection import Projection
+from solution.api.serializers import WorkerAccountBulkSerializer, WorkerAccountSerializer
+from solution.models import OrphanedFile, Profession, User, WorkerAccount
+from solution.views import serve_media
 
 
 @pytest.mark.usefixtures("get_image_file", "get_image_path", "api_user", "format_datetime")
@@ -13,7 +33,7 @@ class WorkerAccountTestCase(APITestCase):
     user: User
     auth_client: APIClient
     get_image_file: Callable
-    get_image_path: Callable[[int, str], str]
+    get_image_path: Callable[[str], str]
     format_datetime: Callable
 
     def setUp(self):
@@ -57,13 +77,26 @@ class WorkerAccountTestCase(APITestCase):
 
         assert response.data == self.worker_account
 
+    def test_projection_matches_serializer(self):
+        self.create_account(has_photo=True)
+        self.auth_client.force_authenticate(user=User.objects.create_user("ann"))
+        self.create_account(has_photo=False)
+        self.auth_client.force_authenticate(user=self.user)
+
+        queryset = WorkerAccount.objects.order_by("user")
+        serializer = WorkerAccountSerializer(
+            queryset, many=True, context={"request": RequestFactory().get("/")}
+        )
+        assert len(serializer.data) == 2
+        assert list(Projection(serializer.child).rows(queryset)) == serializer.data
+
     def test_create_account_with_photo(self):
         response = self.create_account(has_photo=True)
         assert response.status_code == 201
 
         # Change the current working directory to the specified directory
 
-        self.worker_account["photo"] = self.get_image_path(self.user.id, "worker")
+        self.worker_account["photo"] = self.get_image_path("worker")
 
         response.data["lastUpdate"] = self.format_datetime(response.data["lastUpdate"])
 
@@ -112,3 +145,284 @@ class WorkerAccountTestCase(APITestCase):
         response = self.auth_client.delete("/solution-api/worker-account")
 
         assert response.status_code == 204
+
+
+class WorkerSearchTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        painter = Profession.objects.get(name="Painter")
+        carpenter = Profession.objects.get(name="Carpenter")
+
+        cls.workers = {}
+        for username, profession, rating, verified_id, driving_license in [
+            ("ann", painter, 5, True, True),
+            ("bob", painter, 3, False, True),
+            ("cid", carpenter, 4, True, False),
+            ("dan", carpenter, 4, False, False),
+            ("eve", painter, 1, True, True),
+        ]:
+            user = User.objects.create_user(username, f"{username}@email.com", "123")
+            cls.workers[username] = WorkerAccount.objects.create(
+                user=user,
+                profession=profession,
+                first_name="John",
+                last_name="Doe",
+                birthdate=datetime(1990, 11, 8).date(),
+                phone="10283017238917",
+                location="New York",
+                rating=rating,
+                verified_id=verified_id,
+                driving_license=driving_license,
+            )
+
+    def search(self, **params):
+        names = []
+        url = "/solution-api/workers"
+        while url:
+            response = self.client.get(url, {"pageSize": 2, **params} if not names else None)
+            assert response.status_code == 200
+            names += [
+                User.objects.get(pk=worker["id"]).username for worker in response.data["results"]
+            ]
+            url = response.data["next"]
+
+        return names
+
+    def test_search_order(self):
+        assert self.search() == ["ann", "cid", "dan", "bob", "eve"]
+
+    def test_search_filters(self):
+        assert self.search(roles="Painter") == ["ann", "bob", "eve"]
+        assert self.search(roles="Painter,Carpenter", minRating=4) == ["ann", "cid", "dan"]
+        assert self.search(verifiedId="true") == ["ann", "cid", "eve"]
+        assert self.search(verifiedId="true", drivingLicense="true", minRating=2) == ["ann"]
+        assert self.search(verifiedId="false") == ["ann", "cid", "dan", "bob", "eve"]
+        assert self.search(roles="Gardener") == []
+
+    def test_worker_card(self):
+        # Counters are columns, no per-row queries
+        with self.assertNumQueries(1):
+            response = self.client.get("/solution-api/workers", {"pageSize": 5})
+
+        worker = response.data["results"][0]
+
+        assert worker["id"] == self.workers["ann"].user_id
+        assert worker["profession"] == "Painter"
+        assert "phone" not in worker
+        assert "birthdate" not in worker
+
+
+class WorkerAccountListTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        painter = Profession.objects.get(name="Painter")
+        for username in ("ann", "bob", "cid"):
+            WorkerAccount.objects.create(
+                user=User.objects.create_user(username, f"{username}@email.com", "123"),
+                profession=painter,
+                first_name="John",
+                last_name="Doe",
+                birthdate=datetime(1990, 11, 8).date(),
+                phone="10283017238917",
+                location="New York",
+            )
+
+    def setUp(self):
+        staff = User.objects.create_user("staff", "staff@email.com", "123", is_staff=True)
+        self.client.force_authenticate(user=staff)
+
+    def test_streamed_json(self):
+        with mock.patch.object(WorkerAccountView, "stream_chunk_size", 2):
+            response = self.client.get("/solution-api/worker-account")
+        assert response.streaming
+        assert response["Content-Type"] == "application/json"
+
+        accounts = orjson.loads(b"".join(response.streaming_content))
+        assert [x["profession"] for x in accounts] == ["Painter"] * 3
+        assert "firstName" in accounts[0]
+
+    def test_streamed_ndjson(self):
+        response = self.client.get(
+            "/solution-api/worker-account", HTTP_ACCEPT="application/x-ndjson"
+        )
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+
+        lines = b"".join(response.streaming_content).splitlines()
+        assert len(lines) == 3
+        assert all(orjson.loads(line)["lastName"] == "Doe" for line in lines)
+
+    def test_empty_list(self):
+        WorkerAccount.objects.all().delete()
+        response = self.client.get("/solution-api/worker-account")
+        assert b"".join(response.streaming_content) == b"[]"
+
+
+class CamelCaseTestCase(SimpleTestCase):
+    def test_field_name_maps(self):
+        assert WorkerAccountSerializer.camel_names["driving_license"] == "drivingLicense"
+        assert WorkerAccountSerializer.snake_names["drivingLicense"] == "driving_license"
+        # Subclasses get their own maps
+        assert "photo" not in WorkerAccountBulkSerializer.camel_names
+
+    def test_schema_properties(self):
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+        properties = schema["components"]["schemas"]["WorkerAccount"]["properties"]
+        assert "drivingLicense" in properties
+        assert "driving_license" not in properties
+        assert "firstName" in schema["components"]["schemas"]["WorkerAccount"]["required"]
+
+
+class WorkerPhotoVariantsTestCase(APITestCase):
+    def setUp(self):
+        media_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, media_root)
+        # Files written by the test itself are collected right away
+        self.enterContext(override_settings(MEDIA_ROOT=media_root, MEDIA_ORPHAN_GRACE_PERIOD=0))
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.worker = self.create_worker("ann", self.photo((155, 0, 0)))
+        assert len(callbacks) == 1
+
+    def photo(self, color):
+        image = io.BytesIO()
+        Image.new("RGB", (1000, 800), color=color).save(image, "PNG")
+        return SimpleUploadedFile("photo.png", image.getvalue())
+
+    def create_worker(self, username, photo):
+        return WorkerAccount.objects.create(
+            user=User.objects.create_user(username, f"{username}@email.com", "123"),
+            profession=Profession.objects.get(name="Painter"),
+            first_name="John",
+            last_name="Doe",
+            birthdate=datetime(1990, 11, 8).date(),
+            phone="10283017238917",
+            location="New York",
+            photo=photo,
+        )
+
+    def test_variants(self):
+        images.generate_variants(WorkerAccount, self.worker.pk, "photo", in_process=True)
+        self.worker.refresh_from_db()
+
+        assert list(self.worker.photo_variants) == list(images.VARIANTS)
+        storage = self.worker.photo.storage
+        for variant, size in images.VARIANTS.items():
+            name = self.worker.photo_variants[variant]["webp"]
+            assert images.original_path(name) == self.worker.photo.name
+            with Image.open(storage.path(name)) as image:
+                assert image.format == "WEBP"
+                assert max(image.size) == min(size, 1000)
+
+        response = self.client.get("/solution-api/workers")
+        assert response.data["results"][0]["photo"].endswith(".thumbnail.webp")
+
+    def test_replaced_photo_drops_variants(self):
+        images.generate_variants(WorkerAccount, self.worker.pk, "photo", in_process=True)
+        self.worker.refresh_from_db()
+
+        self.worker.photo = self.photo((0, 155, 0))
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.worker.save()
+
+        # New variants, and deletion of the old photo and variants
+        assert len(callbacks) == 2
+        assert WorkerAccount.objects.get(pk=self.worker.pk).photo_variants == {}
+
+        response = self.client.get("/solution-api/workers")
+        assert response.data["results"][0]["photo"].endswith(".png")
+
+    def test_same_photo_is_stored_once(self):
+        images.generate_variants(WorkerAccount, self.worker.pk, "photo", in_process=True)
+        self.worker.refresh_from_db()
+        variants = self.worker.photo_variants
+
+        # Uploading the same file again changes nothing
+        self.worker.photo = self.photo((155, 0, 0))
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.worker.save()
+        assert callbacks == []
+        assert WorkerAccount.objects.get(pk=self.worker.pk).photo_variants == variants
+
+        other = self.create_worker("bob", self.photo((155, 0, 0)))
+        assert other.photo.name == self.worker.photo.name
+        images.generate_variants(WorkerAccount, other.pk, "photo", in_process=True)
+        assert WorkerAccount.objects.get(pk=other.pk).photo_variants == variants
+
+        # Still referenced by the other account
+        self.worker.delete()
+        assert media.delete_orphans() == 0
+        storage = other.photo.storage
+        assert all(storage.exists(name) for name in media.file_names(other))
+
+    def test_replaced_photo_is_collected(self):
+        images.generate_variants(WorkerAccount, self.worker.pk, "photo", in_process=True)
+        worker = WorkerAccount.objects.get(pk=self.worker.pk)
+        old_names = media.file_names(worker)
+        assert len(old_names) == 1 + len(images.VARIANTS)
+
+        worker.photo = self.photo((0, 155, 0))
+        with self.captureOnCommitCallbacks():
+            worker.save()
+
+        assert sorted(OrphanedFile.objects.values_list("name", flat=True)) == sorted(old_names)
+        storage = worker.photo.storage
+        assert all(storage.exists(name) for name in old_names)
+
+        assert media.delete_orphans() == len(old_names)
+        assert not any(storage.exists(name) for name in old_names)
+        assert storage.exists(worker.photo.name)
+        assert not OrphanedFile.objects.exists()
+
+    @override_settings(MEDIA_ORPHAN_GRACE_PERIOD=60)
+    def test_reused_file_outlives_orphan(self):
+        storage = self.worker.photo.storage
+        name = self.worker.photo.name
+        old = time.time() - 3600
+        os.utime(storage.path(name), (old, old))
+
+        # Deleted, then uploaded again by a transaction that hasn't committed yet
+        self.worker.delete()
+        assert storage.save(name, self.photo((155, 0, 0))) == name
+
+        assert media.delete_orphans() == 0
+        assert storage.exists(name)
+        assert OrphanedFile.objects.filter(name=name).exists()
+
+        # Nobody committed a row holding it, a later pass deletes it
+        os.utime(storage.path(name), (old, old))
+        assert media.delete_orphans() == 1
+        assert not storage.exists(name)
+        assert not OrphanedFile.objects.exists()
+
+    def test_sweep_media(self):
+        storage = self.worker.photo.storage
+        stray = storage.save("solution/worker/stray.png", ContentFile(b"stray"))
+
+        call_command("sweep_media", min_age=0, stdout=io.StringIO())
+        assert not storage.exists(stray)
+        assert storage.exists(self.worker.photo.name)
+
+    def test_variants_of_legacy_photo(self):
+        # Stored before names were content hashes
+        storage = self.worker.photo.storage
+        legacy = "solution/worker/legacy.png"
+        Path(storage.path(legacy)).parent.mkdir(parents=True, exist_ok=True)
+        os.replace(storage.path(self.worker.photo.name), storage.path(legacy))
+        WorkerAccount.objects.filter(pk=self.worker.pk).update(photo=legacy)
+
+        images.generate_variants(WorkerAccount, self.worker.pk, "photo", in_process=True)
+        self.worker.refresh_from_db()
+        names = [
+            name for formats in self.worker.photo_variants.values() for name in formats.values()
+        ]
+        assert all(images.original_path(name) == legacy for name in names)
+
+        call_command("sweep_media", min_age=0, stdout=io.StringIO())
+        assert all(storage.exists(name) for name in names)
+
+    def test_media_is_immutable(self):
+        request = RequestFactory().get("/")
+        response = serve_media(request, self.worker.photo.name, document_root=settings.MEDIA_ROOT)
+        assert "immutable" in response["Cache-Control"]
+        assert "max-age=31536000" in response["Cache-Control"]
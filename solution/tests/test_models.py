@@ -1,9 +1,33 @@
 import datetime
+import io
+import os
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+from unittest import mock
 
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection
 from django.forms import ValidationError
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
 
-from solution.models import Contract, EmployerAccount, Job, User
+from solution import static_data, validators
+from solution.models import (
+    Contract,
+    EmployerAccount,
+    EmployerFeedback,
+    Job,
+    Profession,
+    SaveMode,
+    User,
+    WorkerAccount,
+    WorkerFeedback,
+    get_company_size,
+)
 
 
 class JSONFieldsTestCase(TestCase):
@@ -114,3 +138,325 @@ class ContractTestCase(TestCase):
             Contract.objects.create(
                 start_date=datetime.date(2020, 1, 1), end_date=datetime.date(2020, 1, 1)
             )
+
+
+class AccountsTestData:
+    employer: EmployerAccount
+    workers: list[WorkerAccount]
+    job: Job
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("jack", "jack@email.com", "123")
+        cls.employer = EmployerAccount.objects.create(
+            user=user,
+            company_name="test",
+            address="test",
+            legal_name="test",
+            industry="test",
+            company_size="medium",
+            location="test",
+            role="test",
+            first_name="john",
+            last_name="doe",
+            phone="12345918723897",
+        )
+
+        cls.workers = []
+        for username in ("ann", "bob"):
+            user = User.objects.create_user(username, f"{username}@email.com", "123")
+            cls.workers.append(
+                WorkerAccount.objects.create(
+                    user=user,
+                    profession=Profession.objects.get(name="Painter"),
+                    first_name="John",
+                    last_name="Doe",
+                    birthdate=datetime.date(1990, 11, 8),
+                    phone="10283017238917",
+                    location="New York",
+                )
+            )
+
+        cls.job = Job.objects.create(
+            title="test",
+            employer=cls.employer,
+            start_date=datetime.date.today(),
+            description="test",
+            location="test",
+            types=["Part-Time"],
+            shifts=["Day Shift"],
+            responsibilities=["test"],
+            qualifications=["test"],
+            benefits=["test"],
+            min_salary=0,
+            max_salary=50_000,
+            period_salary="test",
+            application_instructions="test",
+            tags=["Temporary"],
+        )
+
+
+class WorkerCountersTestCase(AccountsTestData, TestCase):
+    def counters(self):
+        return [
+            (worker.review_count, worker.jobs_done)
+            for worker in WorkerAccount.objects.order_by("user__username")
+        ]
+
+    def test_review_count(self):
+        ann, bob = self.workers
+        feedback = EmployerFeedback.objects.create(
+            employer=self.employer, worker=ann, job=self.job, rating=4, text="test"
+        )
+        assert self.counters() == [(1, 0), (0, 0)]
+
+        feedback = EmployerFeedback.objects.get(pk=feedback.pk)
+        feedback.worker = bob
+        feedback.save()
+        assert self.counters() == [(0, 0), (1, 0)]
+
+        feedback.delete()
+        assert self.counters() == [(0, 0), (0, 0)]
+
+    def test_ratings(self):
+        ann, bob = self.workers
+        first = EmployerFeedback.objects.create(
+            employer=self.employer, worker=ann, job=self.job, rating=4, text="test"
+        )
+        job = Job.objects.get(pk=self.job.pk)
+        job.pk = uuid.uuid4()
+        job._state.adding = True
+        job.save()
+        second = EmployerFeedback.objects.create(
+            employer=self.employer, worker=ann, job=job, rating=1, text="test"
+        )
+        ann.refresh_from_db()
+        assert (ann.rating, ann.rating_sum, ann.review_count) == (2.5, 5, 2)
+
+        second.rating = 5
+        second.save()
+        ann.refresh_from_db()
+        assert ann.rating == 4.5
+
+        first.delete()
+        second.delete()
+        ann.refresh_from_db()
+        assert (ann.rating, ann.rating_sum, ann.review_count) == (0, 0, 0)
+
+        WorkerFeedback.objects.create(
+            employer=self.employer, worker=bob, job=self.job, rating=3, text="test"
+        )
+        self.employer.refresh_from_db()
+        assert (self.employer.rating, self.employer.review_count) == (3, 1)
+
+    def test_ratings_of_partial_instances(self):
+        ann, _ = self.workers
+        feedback = EmployerFeedback.objects.create(
+            employer=self.employer, worker=ann, job=self.job, rating=4, text="test"
+        )
+
+        # Built by hand, without the stored values
+        EmployerFeedback(
+            pk=feedback.pk, employer=self.employer, worker=ann, job=self.job, rating=2, text="test"
+        ).save(mode=SaveMode.TRUSTED)
+        ann.refresh_from_db()
+        assert (ann.rating_sum, ann.review_count) == (2, 1)
+
+        partial = EmployerFeedback.objects.only("pk", "text").get(pk=feedback.pk)
+        partial.rating = 3
+        partial.save(update_fields=["rating"])
+        ann.refresh_from_db()
+        assert (ann.rating_sum, ann.review_count) == (3, 1)
+
+        # Changed but not saved before the delete
+        feedback = EmployerFeedback.objects.get(pk=feedback.pk)
+        feedback.rating = 5
+        feedback.delete()
+        ann.refresh_from_db()
+        assert (ann.rating_sum, ann.review_count) == (0, 0)
+
+    def test_jobs_done(self):
+        ann, bob = self.workers
+        self.job.workers.add(ann)
+        assert self.counters() == [(0, 0), (0, 0)]
+
+        self.job.done = True
+        self.job.save()
+        assert self.counters() == [(0, 1), (0, 0)]
+
+        bob.jobs.add(self.job)
+        assert self.counters() == [(0, 1), (0, 1)]
+
+        self.job.workers.remove(bob)
+        assert self.counters() == [(0, 1), (0, 0)]
+
+        self.job.workers.clear()
+        assert self.counters() == [(0, 0), (0, 0)]
+
+        self.job.workers.set([ann, bob])
+        assert self.counters() == [(0, 1), (0, 1)]
+
+        self.job.delete()
+        assert self.counters() == [(0, 0), (0, 0)]
+
+    def test_remove_non_member(self):
+        ann, bob = self.workers
+        self.job.workers.add(ann)
+        self.job.done = True
+        self.job.save()
+
+        self.job.workers.remove(bob)
+        bob.jobs.remove(self.job)
+        assert self.counters() == [(0, 1), (0, 0)]
+
+        other = Job.objects.get(pk=self.job.pk)
+        other.pk = None
+        other._state.adding = True
+        other.save(mode=SaveMode.TRUSTED)
+        other.workers.add(bob)
+        assert self.counters() == [(0, 1), (0, 1)]
+
+        self.job.workers.remove(ann, bob)
+        ann.jobs.remove(other)
+        assert self.counters() == [(0, 0), (0, 1)]
+
+    def test_reconcile_command(self):
+        ann, bob = self.workers
+        self.job.workers.add(ann, bob)
+        Job.objects.filter(pk=self.job.pk).update(done=True)
+        EmployerFeedback.objects.bulk_create(
+            [EmployerFeedback(employer=self.employer, worker=bob, job=self.job, rating=4, text="")]
+        )
+        WorkerFeedback.objects.bulk_create(
+            [WorkerFeedback(employer=self.employer, worker=bob, job=self.job, rating=2, text="")]
+        )
+        assert self.counters() == [(0, 0), (0, 0)]
+
+        call_command("reconcile_account_counters", chunk_size=1, stdout=io.StringIO())
+        assert self.counters() == [(0, 1), (1, 1)]
+        assert WorkerAccount.objects.get(pk=bob.pk).rating == 4
+        self.employer.refresh_from_db()
+        assert (self.employer.rating, self.employer.review_count) == (2, 1)
+
+
+class SaveModeTestCase(AccountsTestData, TestCase):
+    def feedback(self, worker, rating=4):
+        return EmployerFeedback(
+            employer=self.employer, worker=worker, job=self.job, rating=rating, text="test"
+        )
+
+    def test_save_modes(self):
+        ann, _ = self.workers
+        self.feedback(ann).save()
+
+        with self.assertRaises(ValidationError):
+            self.feedback(ann).save()
+
+        with self.assertRaises(ValidationError):
+            self.feedback(ann, rating=9).save(mode=SaveMode.FIELDS)
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.assertRaises(IntegrityError):
+                self.feedback(ann).save(mode=SaveMode.FIELDS)
+        assert not [query for query in queries if query["sql"].startswith("SELECT")]
+
+        ann.about = "x" * 1000
+        with self.assertNumQueries(1):
+            ann.save(mode=SaveMode.TRUSTED, update_fields=["about"])
+        with self.assertRaises(ValidationError):
+            ann.save(update_fields=["about"])
+
+    def test_validate_batch(self):
+        ann, bob = self.workers
+        self.feedback(ann).save()
+
+        batch = [
+            self.feedback(ann),
+            self.feedback(bob),
+            self.feedback(bob),
+            self.feedback(bob, rating=9),
+        ]
+        # One query per foreign key and one for the unique constraint
+        with self.assertNumQueries(4):
+            errors = EmployerFeedback.validate_batch(batch)
+        assert list(errors) == [0, 2, 3]
+        assert "rating" in errors[3].message_dict
+
+        with self.assertNumQueries(0):
+            errors = EmployerFeedback.validate_batch(batch, mode=SaveMode.FIELDS)
+        assert list(errors) == [2, 3]
+
+        assert EmployerFeedback.validate_batch(batch, mode=SaveMode.TRUSTED) == {}
+
+
+class StaticDataTestCase(TestCase):
+    def setUp(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        shutil.copy(static_data.STATIC_DATA_DIR / "companySizes.json", directory)
+        self.path = directory / "companySizes.json"
+
+        patcher = mock.patch.object(static_data, "STATIC_DATA_DIR", directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(static_data.loaded.clear)
+        static_data.loaded.clear()
+
+    def test_loaded_once(self):
+        sizes = get_company_size()
+        assert "medium" in sizes
+
+        os.remove(self.path)
+        assert get_company_size() is sizes
+
+    @override_settings(DEBUG=True)
+    def test_reloads_changed_file_in_debug(self):
+        sizes = get_company_size()
+        assert get_company_size() is sizes
+
+        self.path.write_text('{"tiny": "Just me"}')
+        os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 1))
+        assert get_company_size() == {"tiny": "Just me"}
+
+
+class FileValidatorTestCase(TestCase):
+    png: bytes
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        buffer = io.BytesIO()
+        Image.new("RGB", (8, 8)).save(buffer, "PNG")
+        cls.png = buffer.getvalue() + b"\x00" * (1024 * 1024)
+
+    def test_sniffs_header_once(self):
+        validator = validators.FileValidator(max_size=3, content_types=("image/png",))
+        file = SimpleUploadedFile("photo.png", self.png)
+
+        with mock.patch.object(
+            validators.magic, "from_buffer", wraps=validators.magic.from_buffer
+        ) as from_buffer:
+            validator(file)
+            validator(file)
+
+        from_buffer.assert_called_once()
+        assert len(from_buffer.call_args.args[0]) == validator.sniff_size
+        assert file.tell() == 0
+
+    def test_checks_size_before_reading(self):
+        validator = validators.FileValidator(max_size=0.5, content_types=("image/png",))
+        file = SimpleUploadedFile("photo.png", self.png)
+
+        file.file = mock.Mock(wraps=file.file)
+        with self.assertRaises(ValidationError) as context:
+            validator(file)
+
+        assert context.exception.code == "max_size"
+        file.file.read.assert_not_called()
+
+    def test_content_type(self):
+        validator = validators.FileValidator(content_types=("image/jpeg",))
+        with self.assertRaises(ValidationError) as context:
+            validator(SimpleUploadedFile("photo.jpg", self.png))
+
+        assert context.exception.code == "content_type"
@@ -0,0 +1,80 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+import orjson
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, override_settings
+from whitenoise import compress
+
+
+class StaticFilesTestCase(SimpleTestCase):
+    def setUp(self):
+        build_dir = Path(tempfile.mkdtemp())
+        static_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, build_dir)
+        self.addCleanup(shutil.rmtree, static_root)
+
+        # Stand-in for the "vite build" output
+        self.script = b"export const jobs = [];\n" * 100
+        (build_dir / "main-BxKq3a_Z.js").write_bytes(self.script)
+        (build_dir / "main-C7x-sd2k.css").write_text(
+            "body { background: url(/static/solution/bg-DmA1x9Qe.png) }\n" * 100
+        )
+        (build_dir / "bg-DmA1x9Qe.png").write_bytes(b"png")
+        # Named like a Vite chunk, but not part of the build
+        (build_dir / "bootstrap-template.css").write_text("body { margin: 0 }\n")
+        manifest = {
+            "src/main.tsx": {
+                "file": "main-BxKq3a_Z.js",
+                "css": ["main-C7x-sd2k.css"],
+                "assets": ["bg-DmA1x9Qe.png"],
+            }
+        }
+        (build_dir / "manifest.json").write_bytes(orjson.dumps(manifest))
+
+        self.enterContext(
+            override_settings(
+                STATIC_ROOT=static_root,
+                STATICFILES_DIRS=[("solution", build_dir)],
+                STORAGES={
+                    **settings.STORAGES,
+                    "staticfiles": {"BACKEND": "solution.storage.ViteManifestStaticFilesStorage"},
+                },
+            )
+        )
+        call_command("collectstatic", interactive=False, verbosity=0)
+        self.static_root = static_root
+
+    def test_collectstatic(self):
+        vite = self.static_root / "solution"
+        assert (vite / "main-BxKq3a_Z.js").read_bytes() == self.script
+        assert (vite / "main-BxKq3a_Z.js.gz").exists()
+        assert (vite / "main-BxKq3a_Z.js.br").exists() == compress.brotli_installed
+        assert "bg-DmA1x9Qe.png" in (vite / "main-C7x-sd2k.css").read_text()
+        assert not list(vite.glob("main-C7x-sd2k.*.css"))
+        assert not list(vite.glob("bg-DmA1x9Qe.*.png"))
+        assert (vite / "manifest.json").exists()
+
+        # Files missing from the Vite manifest are hashed by Django
+        assert list(vite.glob("bootstrap-template.*.css"))
+        assert list((self.static_root / "rest_framework/css").glob("default.*.css"))
+
+    def test_immutable(self):
+        client = Client()
+        response = client.get("/static/solution/main-BxKq3a_Z.js", HTTP_ACCEPT_ENCODING="gzip")
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "immutable" in response.headers["Cache-Control"]
+
+        response = client.get("/static/solution/bg-DmA1x9Qe.png")
+        assert "immutable" in response.headers["Cache-Control"]
+
+        for name in ("manifest.json", "bootstrap-template.css"):
+            response = client.get(f"/static/solution/{name}")
+            assert response.status_code == 200
+            assert "immutable" not in response.headers.get("Cache-Control", "")
+
+        hashed = next((self.static_root / "solution").glob("bootstrap-template.*.css")).name
+        response = client.get(f"/static/solution/{hashed}")
+        assert "immutable" in response.headers["Cache-Control"]
@@ -1,8 +1,8 @@
 import os
 from pathlib import Path
+from typing import Iterable, Sequence
 from uuid import uuid4
 
-from django.conf import settings
 
 app_name = Path(__file__).resolve().parent.name
 
@@ -21,6 +21,27 @@ def form_errors_handler(error_dict: dict[str, list[str]] | None) -> FormErrors |
         return FormErrors(error_dict)
 
 
+def to_bitmask(values: Iterable[str], choices: Sequence[str]) -> int:
+    """
+    Set bit ``i`` for every value equal to ``choices[i]``. Unknown values are ignored,
+    validators report them.
+    """
+    mask = 0
+    for value in values:
+        if value in choices:
+            mask |= 1 << choices.index(value)
+    return mask
+
+
+def from_bitmask(mask: int, choices: Sequence[str]) -> list[str]:
+    return [choice for i, choice in enumerate(choices) if mask & (1 << i)]
+
+
+def chunked(values: Sequence, size: int):
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
 def upload_path(instance, filename):
     """
     file will be uploaded to MEDIA_ROOT/user_<id>/<random_filename>
@@ -54,12 +75,7 @@ def employer_photo_path(instance, filename):
 
 
 def account_path_handler(instance, filename, extra_path):
+    # solution.storage.ContentAddressedStorage names the file by its content hash
+    # in this directory. Replaced files are deleted by solution.media.
     file_ext = os.path.splitext(filename)[1]
-    path = f"{app_name}/user_{instance.user_id}/{extra_path}"
-
-    # Remove old files
-    for root, _, files in os.walk(settings.MEDIA_ROOT / path):
-        for file in files:
-            os.remove(os.path.join(root, file))
-
-    return f"{path}{uuid4().hex}{file_ext}"
+    return f"{app_name}/{extra_path}upload{file_ext}"
@@ -4,6 +4,7 @@ import re
 import magic
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
+from django.db.models.fields.files import FieldFile
 from django.template.defaultfilters import (
     filesizeformat,
 )
@@ -14,6 +15,8 @@ from django.utils.translation import (
     gettext_lazy as _,
 )
 
+# Job stores JOB_TYPES, SHIFTS and TAGS as bitmasks of their positions in these
+# lists. Only ever append to them.
 JOB_TYPES = [
     "Part-Time",
     "Full-Time",
@@ -152,6 +155,9 @@ class FileValidator:
         "content_type": _("File of type %(content_type)s are not supported."),
     }
 
+    # libmagic identifies images and most other formats from the first bytes
+    sniff_size = 2048
+
     def __init__(
         self,
         max_size=None,
@@ -163,6 +169,12 @@ class FileValidator:
         self.content_types = content_types
 
     def __call__(self, file):
+        if isinstance(file, FieldFile):
+            # Stored files were validated when they were uploaded
+            if file._committed:
+                return
+            file = file.file
+
         if self.max_size is not None and file.size > self.max_size:
             params = {
                 "max_size": filesizeformat(self.max_size),
@@ -186,8 +198,7 @@ class FileValidator:
             )
 
         if self.content_types is not None:
-            content_type = magic.from_buffer(file.read(), mime=True)
-            file.seek(0)
+            content_type = self.sniff_content_type(file)
 
             if content_type not in self.content_types:
                 params = {"content_type": content_type}
@@ -199,6 +210,20 @@ class FileValidator:
 
         return file
 
+    def sniff_content_type(self, file) -> str:
+        """
+        Detect the MIME type from the first ``sniff_size`` bytes of the file. The
+        result is kept on the file object, so validating it again costs nothing.
+        """
+        content_type = getattr(file, "_sniffed_content_type", None)
+        if content_type is None:
+            file.seek(0)
+            content_type = magic.from_buffer(file.read(self.sniff_size), mime=True)
+            file.seek(0)
+            file._sniffed_content_type = content_type
+
+        return content_type
+
     def __eq__(self, other):
         return (
             isinstance(other, FileValidator)
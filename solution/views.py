@@ -1,13 +1,22 @@
+import hashlib
+
 from django.contrib.auth import authenticate, login, logout
-from django.core.exceptions import ValidationError
-from django.http import HttpRequest
+from django.http import HttpRequest, HttpResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import redirect, render
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.views import static
 from django.views.generic import TemplateView
 
 # from django.contrib.auth.decorators import login_required
 # from django.utils.decorators import method_decorator
+from solution import ratelimit, shell
 from solution.forms import LoginForm, RegisterForm
 from solution.models import User
+from solution.storage import content_storage
+
+
+TOO_MANY_ATTEMPTS = "Too many attempts, please try again later"
 
 
 class AuthHttpRequest(HttpRequest):
@@ -34,43 +43,53 @@ class IndexView(TemplateView):
                 "authenticated": request.user.is_authenticated,
                 "hasAccount": False,
             }
-        context = {"user_data": user_data}
 
-        return render(request, self.template_name, context)
+        index = shell.get(self.template_name)
+        csrf_token = get_token(request)
+
+        if request.user.is_authenticated:
+            return HttpResponse(index.render(user_data, csrf_token))
+
+        # Anonymous visitors all get the same page except for the CSRF token. Any
+        # masked token of the session secret stays valid, so the page the browser
+        # already has can be reused for as long as the secret doesn't change.
+        secret = request.META["CSRF_COOKIE"]
+        etag = quote_etag(hashlib.sha256(f"{index.digest}:{secret}".encode()).hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(index.render(user_data, csrf_token))
+
+        response.headers["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
 
 class RegisterView(TemplateView):
     template_name = "solution/register.html"
 
     def post(self, request: HttpRequest):
+        keys = ratelimit.identities(request, request.POST.get("username"))
+        if ratelimit.attempt("register", keys) is not None:
+            return render(
+                request,
+                self.template_name,
+                {"auth_error": TOO_MANY_ATTEMPTS, "fields": request.POST},
+                status=429,
+            )
+
         form = RegisterForm(request.POST)
 
         if form.is_valid():
-            email: str = form.cleaned_data["email"]
-            password: str = form.cleaned_data["password"]
-            username: str = form.cleaned_data["username"]
-
-            try:
-                user: User = User.objects.create_user(
-                    username=username, email=email, password=password
-                )
-                user.user_permissions.clear()
-
+            user = form.save()
+            if user is not None:
                 login(request=request, user=user)
                 return redirect("solution:index")
 
-            except ValidationError:
-                return render(
-                    request,
-                    self.template_name,
-                    {"form_errors": form.errors, "fields": form.cleaned_data},
-                )
-        else:
-            return render(
-                request,
-                self.template_name,
-                {"form_errors": form.errors, "fields": form.cleaned_data},
-            )
+        return render(
+            request,
+            self.template_name,
+            {"form_errors": form.errors, "fields": form.cleaned_data},
+        )
 
 
 class LoginView(TemplateView):
@@ -84,6 +103,12 @@ class LoginView(TemplateView):
             username = email.split("@")[0]
             password = request.POST.get("password")
 
+            keys = ratelimit.identities(request, username)
+            if ratelimit.attempt("login", keys) is not None:
+                return render(
+                    request, self.template_name, {"auth_error": TOO_MANY_ATTEMPTS}, status=429
+                )
+
             user = authenticate(request=request, username=username, password=password)
 
             if user is not None:
@@ -100,3 +125,14 @@ class LoginView(TemplateView):
 def logout_view(request: HttpRequest):
     logout(request)
     return redirect("solution:index")
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """
+    django.views.static.serve for MEDIA_URL. Content-addressed files never
+    change, browsers may keep them for good.
+    """
+    response = static.serve(request, path, document_root, show_indexes)
+    if content_storage.is_content_addressed(path):
+        patch_cache_control(response, public=True, max_age=365 * 24 * 60 * 60, immutable=True)
+    return response